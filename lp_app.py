@@ -1,19 +1,193 @@
 # CREATED BY Laczi Péter - R9SAAO
 
 import os
+import queue
+import re
+import sqlite3
+import struct
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+_LP_IMPORT_T0 = time.perf_counter()
+
+from importlib import import_module
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 
 from lp_game import LPGame
-from lp_stats import LPStats, lp_show_stats_window
+from lp_history import LPHistoryStore
+from lp_profile import LPProfiler, LPProfileOverlay
+from lp_replay import LPRecorder
+from lp_savefile import LPJournal, lp_save_binary
+from lp_stats import LPStats, LP_STATS_HEAVY_MODULES, lp_show_stats_window
 from lp_utils import lp_save_json, lp_load_json
 
 APP_TITLE = "LP Shape Evolution"
+MAX_FPS = 60
+SPLASH_LOGO_MS = 1200  # a splash legalább eddig látszik, utána azonnal vált, ha az app kész
+SPLASH_TEXT_MS = 600
+WARMUP_MODULES = ("lp_scoring", LP_STATS_HEAVY_MODULES[0])
+AUTOSAVE_MS = 5000
+AUTOSAVE_PATH = Path.home() / ".lp_shape_evolution" / "autosave.lpsave"
+SESSIONS_DIR = AUTOSAVE_PATH.parent / "sessions"
+HISTORY_PATH = AUTOSAVE_PATH.parent / "history.sqlite3"
+LARGE_BOARD = (6400, 3600, 200)  # nagy pálya alapértéke: világ szélesség, magasság, párok
+VIEW_PAN_STEP = 120  # nyilakkal görgetés lépése képernyőpixelben
+VIEW_ZOOM_STEP = 1.15
+SAVE_FILETYPES = [("LP mentés", "*.lpsave"), ("JSON", "*.json")]
+LP_PROFILE_GAME = ("redraw", "redraw_shapes", "_update_selection_outline", "drag_to",
+                   "pointer_down", "rotate_active", "scale_active", "check_alignment_batch", "undo", "redo")
+LP_PROFILE_APP = ("on_left_down", "on_drag", "on_left_up", "on_wheel", "rotate", "scale",
+                  "on_check", "on_next", "on_reset", "on_save", "on_load", "on_undo", "on_redo")
+
+
+class LPInputScheduler:
+    # a gyors egér/görgő/billentyű eseményeket gyűjti, és képkockánként egyszer alkalmazza
+    def __init__(self, root, game, max_fps: int = MAX_FPS):
+        self.root = root
+        self.game = game
+        self.frame_ms = 1
+        self.set_max_fps(max_fps)
+        self._pointer = None
+        self._scale = 1.0
+        self._rotate = 0.0
+        self._pending = None
+        self._last_flush = 0.0
+
+    def set_max_fps(self, max_fps: int):
+        self.frame_ms = max(1, int(1000 / max(1, max_fps)))
+
+    def pointer(self, x, y):
+        self._pointer = (x, y)
+        self._schedule()
+
+    def rotate(self, deg):
+        self._rotate += deg
+        self._schedule()
+
+    def scale(self, factor):
+        self._scale *= factor
+        self._schedule()
+
+    def _schedule(self):
+        if self._pending is not None:
+            return
+        wait = self.frame_ms - int((time.perf_counter() - self._last_flush) * 1000)
+        if wait <= 0:
+            self._pending = self.root.after_idle(self.flush)
+        else:
+            self._pending = self.root.after(wait, self.flush)
+
+    def flush(self):
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+            self._pending = None
+        self._last_flush = time.perf_counter()
+        pointer, rotate, scale = self._pointer, self._rotate, self._scale
+        self._pointer = None
+        self._rotate = 0.0
+        self._scale = 1.0
+        if pointer is not None:
+            self.game.drag_to(*pointer)
+        if rotate:
+            self.game.rotate_active(rotate)
+        if scale != 1.0:
+            self.game.scale_active(scale)
+
+
+class LPIOWorker:
+    # lemezműveletek háttérszálon; az eredmény/hiba szálbiztos soron át, root.after lekérdezéssel jut vissza a Tk szálra
+    def __init__(self, root, poll_ms: int = 30):
+        self.root = root
+        self.poll_ms = poll_ms
+        # egyetlen szál: a mentések a kérés sorrendjében íródnak ki
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lp-io")
+        self.results = queue.SimpleQueue()
+        self.pending = 0
+        self._job = None
+
+    @property
+    def busy(self):
+        return self.pending > 0
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        self.pending += 1
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self.results.put((f, on_done, on_error)))
+        if self._job is None:
+            self._job = self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def _poll(self):
+        self._job = None
+        while True:
+            try:
+                future, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            exc = future.exception()
+            if exc is not None:
+                if on_error is not None:
+                    on_error(exc)
+            elif on_done is not None:
+                on_done(future.result())
+        if self.pending:
+            self._job = self.root.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        # kilépéskor a folyamatban lévő mentéseket még megvárja
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self.executor.shutdown(wait=True)
+
+
+class LPStartupTimer:
+    # indulási mérföldkövek ms-ban, a folyamat (main.py) vagy az lp_app importjának kezdetétől
+    def __init__(self, t0: float | None = None):
+        self.t0 = t0 if t0 is not None else _LP_IMPORT_T0
+        self.marks = {}
+
+    def mark(self, name: str):
+        self.marks.setdefault(name, (time.perf_counter() - self.t0) * 1000.0)
+
+    def report(self) -> dict:
+        return dict(self.marks)
+
+    def format(self) -> str:
+        lines = ["Indulási idők (ms):"]
+        prev = 0.0
+        for name, t in self.marks.items():
+            lines.append(f"  {name:<14}{t:9.1f}  (+{t - prev:.1f})")
+            prev = t
+        return "\n".join(lines)
+
+
+def lp_warmup(modules=WARMUP_MODULES):
+    # háttérszálon előtölti a nehéz modulokat, hogy az első használat ne akadjon
+    def run():
+        for name in modules:
+            try:
+                import_module(name)
+            except ImportError:
+                pass
+
+    t = threading.Thread(target=run, name="lp-warmup", daemon=True)
+    t.start()
+    return t
 
 
 class LPApp:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, max_fps: int = MAX_FPS, startup: LPStartupTimer | None = None,
+                 warmup: bool = True):
+        self.startup = startup or LPStartupTimer()
+        self.warmup = warmup
         self.root = root
         self.root.title(APP_TITLE)
         self.root.geometry("1920x1080")
@@ -30,6 +204,41 @@ class LPApp:
         self.canvas = tk.Canvas(self.left, bg="#0f1115", highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
         self.game.attach_canvas(self.canvas)
+        self.input = LPInputScheduler(self.root, self.game, max_fps)
+        self.io = LPIOWorker(self.root)
+        # nagy pályán a nézet (pásztázás, nagyítás); normál pályán None, a képernyő = világ
+        self.view = None
+        self._view_job = None
+        self._pan_from = None
+        # élő nézők: osztott memóriás közzététel, csak ha legalább egy nézői ablakot indítottak
+        self.spectator = None
+        self._spectator_job = None
+        # a nézői ablakok folyamatai: a közzététel addig fut, amíg legalább egy él
+        self._spectators = []
+        self.profiler = LPProfiler()
+        self.profile_overlay = LPProfileOverlay(self.root, self.canvas, self.profiler, frame_ms=self.input.frame_ms)
+        # a naplót csak az IO szál kezeli (egyetlen szál, sorrendben)
+        self.journal = LPJournal(str(AUTOSAVE_PATH))
+        self._autosave_job = None
+        self._autosave_future = None
+        self.recorder = None
+        self.history = None
+        self.session_id = None
+        try:
+            HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+            self.history = LPHistoryStore(str(HISTORY_PATH))
+        except (OSError, sqlite3.Error):
+            pass
+        # LP_COLLECTOR=host:port esetén a teljesített szintek a központi gyűjtőhöz is mennek
+        self.results = None
+        self.session_key = uuid.uuid4().hex
+        collector = os.environ.get("LP_COLLECTOR")
+        if collector:
+            # az asyncio-t húzza be: csak gyűjtő használatakor töltjük be
+            from lp_collector import LPResultClient
+            host, _, port = collector.rpartition(":")
+            self.results = LPResultClient(host or "127.0.0.1", int(port))
+        self.stats.listeners.append(self._on_stats_event)
 
         self.header = tk.Frame(self.right, bg="black")
         self.header.pack(fill=tk.X)
@@ -43,7 +252,8 @@ class LPApp:
         self.level_var = tk.StringVar(value="Szint: 1/5")
         self.info_var = tk.StringVar(
             value=("Egér: mozgatás • Görgő: méretezés • A/D: forgatás ±2° • Shift+A/D: ±10° • "
-                   "Enter: ellenőrzés • Space: következő • S: mentés • L: betöltés • M: stat • R: új játék")
+                   "Enter: ellenőrzés • Space: következő • Ctrl+Z/Ctrl+Y: visszavonás/újra • F6: néző • "
+                   "S: mentés • L: betöltés • M: stat • R: új játék")
         )
 
         ttk.Label(self.right, textvariable=self.level_var, font=("Segoe UI", 12, "bold")).pack(pady=(10, 4))
@@ -61,25 +271,49 @@ class LPApp:
 
         ttk.Separator(self.right).pack(fill=tk.X, pady=8)
         ttk.Button(self.right, text="Statisztika (M)",
-                   command=lambda: lp_show_stats_window(self.root, self.stats)).pack(pady=4, fill=tk.X, padx=8)
+                   command=self.show_stats).pack(pady=4, fill=tk.X, padx=8)
 
         ttk.Separator(self.right).pack(fill=tk.X, pady=8)
         ttk.Button(self.right, text="Eredmény mentése (S)", command=self.on_save).pack(pady=4, fill=tk.X, padx=8)
         ttk.Button(self.right, text="Eredmény betöltése (L)", command=self.on_load).pack(pady=4, fill=tk.X, padx=8)
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(self.right, textvariable=self.status_var, wraplength=240, justify=tk.LEFT).pack(padx=8, pady=4)
 
         menubar = tk.Menu(self.root)
         filemenu = tk.Menu(menubar, tearoff=False)
         filemenu.add_command(label="Mentés", command=self.on_save)
         filemenu.add_command(label="Betöltés", command=self.on_load)
+        filemenu.add_command(label="Automatikus mentés visszaállítása", command=self.on_restore_autosave)
+        filemenu.add_command(label="Pályacsomag betöltése", command=self.on_load_pack)
         menubar.add_cascade(label="Fájl", menu=filemenu)
+        gamemenu = tk.Menu(menubar, tearoff=False)
+        gamemenu.add_command(label="Visszavonás", accelerator="Ctrl+Z", command=self.on_undo)
+        gamemenu.add_command(label="Újra", accelerator="Ctrl+Y", command=self.on_redo)
+        gamemenu.add_separator()
+        gamemenu.add_command(label="Nagy pálya…", command=self.on_large_board)
+        gamemenu.add_command(label="Normál pálya", command=self.on_normal_board)
+        gamemenu.add_command(label="Teljes pálya nézet", accelerator="Home", command=self.on_view_fit)
+        gamemenu.add_separator()
+        gamemenu.add_command(label="Nézői ablak", accelerator="F6", command=self.on_spectate)
+        gamemenu.add_separator()
+        self.assign_var = tk.BooleanVar(value=self.game.match_mode == "assign")
+        gamemenu.add_checkbutton(label="Szabad párosítás (bármely azonos alakú célhoz)",
+                                 variable=self.assign_var, command=self.on_match_mode)
+        menubar.add_cascade(label="Játék", menu=gamemenu)
         self.root.config(menu=menubar)
 
-        self.canvas.bind("<Button-1>", self.on_left_down)
-        self.canvas.bind("<B1-Motion>", self.on_drag)
-        self.canvas.bind("<ButtonRelease-1>", self.on_left_up)
-        self.canvas.bind("<MouseWheel>", self.on_wheel)
-        self.canvas.bind("<Button-4>", self.on_wheel)
-        self.canvas.bind("<Button-5>", self.on_wheel)
+        # lambdák, hogy a profilozó által burkolt metódusok is érvényesüljenek
+        self.canvas.bind("<Button-1>", lambda e: self.on_left_down(e))
+        self.canvas.bind("<B1-Motion>", lambda e: self.on_drag(e))
+        self.canvas.bind("<ButtonRelease-1>", lambda e: self.on_left_up(e))
+        self.canvas.bind("<MouseWheel>", lambda e: self.on_wheel(e))
+        self.canvas.bind("<Button-4>", lambda e: self.on_wheel(e))
+        self.canvas.bind("<Button-5>", lambda e: self.on_wheel(e))
+        # nagy pályán: jobb/középső gombbal húzva pásztázás, Ctrl+görgő nagyítás
+        for button in (2, 3):
+            self.canvas.bind(f"<Button-{button}>", lambda e: self.on_pan_start(e))
+            self.canvas.bind(f"<B{button}-Motion>", lambda e: self.on_pan(e))
+        self.canvas.bind("<Configure>", lambda e: self._request_view(), add="+")
 
         self.root.bind("<KeyPress-a>", lambda e: self.rotate(-2))
         self.root.bind("<KeyPress-d>", lambda e: self.rotate(+2))
@@ -89,10 +323,28 @@ class LPApp:
         self.root.bind("<space>", lambda e: self.on_next())
         self.root.bind("<KeyPress-s>", lambda e: self.on_save())
         self.root.bind("<KeyPress-l>", lambda e: self.on_load())
-        self.root.bind("<KeyPress-m>", lambda e: lp_show_stats_window(self.root, self.stats))
+        self.root.bind("<KeyPress-m>", lambda e: self.show_stats())
         self.root.bind("<KeyPress-r>", lambda e: self.on_reset())
+        self.root.bind("<Control-z>", lambda e: self.on_undo())
+        self.root.bind("<Control-y>", lambda e: self.on_redo())
+        self.root.bind("<Control-Z>", lambda e: self.on_redo())
+        self.root.bind("<Left>", lambda e: self.pan_view(VIEW_PAN_STEP, 0))
+        self.root.bind("<Right>", lambda e: self.pan_view(-VIEW_PAN_STEP, 0))
+        self.root.bind("<Up>", lambda e: self.pan_view(0, VIEW_PAN_STEP))
+        self.root.bind("<Down>", lambda e: self.pan_view(0, -VIEW_PAN_STEP))
+        self.root.bind("<KeyPress-plus>", lambda e: self.zoom_view(VIEW_ZOOM_STEP))
+        self.root.bind("<KeyPress-minus>", lambda e: self.zoom_view(1 / VIEW_ZOOM_STEP))
+        self.root.bind("<Home>", lambda e: self.on_view_fit())
         self.root.bind("<Escape>", lambda e: self.on_exit())
+        self.root.bind("<F3>", lambda e: self.toggle_profiler())
+        self.root.bind("<F4>", lambda e: self.dump_profile())
+        self.root.bind("<F5>", lambda e: self.toggle_recording())
+        self.root.bind("<F6>", lambda e: self.on_spectate())
+
+        if os.environ.get("LP_PROFILE"):
+            self.toggle_profiler()
 
+        self.startup.mark("app_init")
         self.show_splash_and_ask_name()
 
     def _find_logo_path(self) -> str | None:
@@ -107,11 +359,12 @@ class LPApp:
         return None
 
     def show_splash_and_ask_name(self):
-        self.canvas.delete("all")
+        # a rajzoló réteg állandó elemei is törlődnek, a játék első rajzolásakor újra létrejönnek
+        self.game.renderer.clear()
         self.root.update_idletasks()
         w = self.canvas.winfo_width() or self.game.width
         h = self.canvas.winfo_height() or self.game.height
-        self.canvas.create_rectangle(0, 0, w, h, fill="#0f1115", outline="")
+        self.canvas.create_rectangle(0, 0, w, h, fill="#0f1115", outline="", tags=("splash",))
         self.splash_img_id = None
         self.splash_shape_text_id = None
         self.splash_evol_text_id = None
@@ -131,8 +384,17 @@ class LPApp:
                 font=("Segoe UI", 56, "bold"), anchor="center"
             )
         self.root.after(10, self._center_splash_now)
-        self.canvas.bind("<Configure>", lambda e: self._center_splash_now())
-        self.root.after(4000, self._show_shape_evolution_text)
+        self.canvas.bind("<Configure>", lambda e: self._center_splash_now(), add="+")
+        self._splash_t0 = time.perf_counter()
+        self.root.after_idle(self._on_first_frame)
+
+    def _on_first_frame(self):
+        # az első kirajzolás után: háttér-előtöltés, és a splash csak a minimális ideig marad
+        self.startup.mark("first_frame")
+        if self.warmup:
+            lp_warmup()
+        shown = int((time.perf_counter() - self._splash_t0) * 1000)
+        self.root.after(max(0, SPLASH_LOGO_MS - shown), self._show_shape_evolution_text)
 
     def _show_shape_evolution_text(self):
         if self.splash_img_id:
@@ -154,7 +416,7 @@ class LPApp:
             font=("Segoe UI", 44, "bold"), anchor="w"
         )
         self._center_splash_now()
-        self.root.after(2000, self._ask_name)
+        self.root.after(SPLASH_TEXT_MS, self._ask_name)
 
     def _center_splash_now(self):
         self.root.update_idletasks()
@@ -170,18 +432,78 @@ class LPApp:
             self.canvas.coords(self.splash_evol_text_id, cx + gap, cy)
 
     def _ask_name(self):
+        self.startup.mark("splash_done")
         for eid in (self.splash_img_id, self.splash_shape_text_id, self.splash_evol_text_id):
             if eid:
                 try:
                     self.canvas.delete(eid)
                 except:
                     pass
+        self.canvas.delete("splash")
+        # a splash igazító kezelője lekerül; a tkinter unbind(funcid) minden kezelőt törölne,
+        # ezért a <Configure> újra csak a nézetfrissítést kapja
+        self.canvas.bind("<Configure>", lambda e: self._request_view())
         name = simpledialog.askstring("Játékos neve", "Add meg a neved:", parent=self.root) or "Névtelen"
         self.player_var.set(f"Játékban: {name}")
         self.game.player_name = name
         self._ask_difficulty()
+        self.startup.mark("dialogs_done")
+        if self.history is not None:
+            self.session_id = self.history.start_session(name, self.game.difficulty, self.game.seed)
         self.game.new_level()
         self.refresh_labels()
+        self._schedule_autosave()
+        self.root.after_idle(self._on_interactive)
+
+    def _on_interactive(self):
+        self.startup.mark("interactive")
+        if os.environ.get("LP_STARTUP"):
+            print(self.startup.format(), file=sys.stderr)
+
+    def _schedule_autosave(self):
+        if self._autosave_job is None:
+            self._autosave_job = self.root.after(AUTOSAVE_MS, self._autosave)
+
+    def _autosave(self):
+        self._autosave_job = None
+        # pillanatkép a Tk szálon; a különbség, a kódolás és az fsync a háttérszálon fut
+        # lassú lemeznél nem torlódnak fel a kérések: amíg az előző fut, ez a kör kimarad
+        if self._autosave_future is None or self._autosave_future.done():
+            self._autosave_future = self.io.submit(self._journal_record, self.game.to_dict(),
+                                                   on_error=self._autosave_error)
+        if self.history is not None:
+            try:
+                self.history.flush()
+            except sqlite3.Error:
+                pass
+        self._schedule_autosave()
+
+    def _journal_record(self, state: dict) -> int:
+        # IO szál
+        AUTOSAVE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        return self.journal.record(state)
+
+    def _autosave_error(self, exc: BaseException):
+        # az autosave csendben újrapróbál a következő körben; csak a váratlan hibát jelezzük
+        if not isinstance(exc, OSError):
+            self.status_var.set(f"Automatikus mentés sikertelen: {exc}")
+
+    def _on_stats_event(self, stats, event, level):
+        # minden teljesített szint bekerül a helyi történetbe (a betöltés nem számít)
+        if event != "finish":
+            return
+        if self.results is not None:
+            from lp_collector import lp_level_record
+            self.results.submit(lp_level_record(stats.as_dict(), self.game.player_name, self.game.difficulty,
+                                                level, self.session_key))
+        if self.history is None or self.session_id is None:
+            return
+        self.history.record_level(self.session_id, self.game.player_name, self.game.difficulty, level,
+                                  stats.elapsed[level], stats.attempts[level], stats.lives_lost[level])
+
+    def show_stats(self):
+        lp_show_stats_window(self.root, self.stats, self.history,
+                             lambda: (self.game.player_name, self.game.difficulty))
 
     def _ask_difficulty(self):
         win = tk.Toplevel(self.root)
@@ -212,33 +534,133 @@ class LPApp:
         self.root.wait_window(win)
 
     def refresh_labels(self):
+        self.assign_var.set(self.game.match_mode == "assign")
         self.level_var.set(f"Szint: {self.game.level}/{self.game.level_count}")
         self.hearts_var.set("❤" * self.game.lives)
 
+    def _world(self, event):
+        # képernyő -> világ koordináta; a játék mindig világkoordinátát kap
+        if self.view is None:
+            return event.x, event.y
+        return self.view.to_world(event.x, event.y)
+
     def on_left_down(self, event):
-        self.game.pointer_down(event.x, event.y)
+        self.input.flush()
+        self.game.pointer_down(*self._world(event))
         self.refresh_labels()
 
     def on_drag(self, event):
-        self.game.drag_to(event.x, event.y)
+        self.input.pointer(*self._world(event))
 
     def on_left_up(self, event):
-        self.game.pointer_up(event.x, event.y)
+        self.input.flush()
+        self.game.pointer_up(*self._world(event))
 
     def on_wheel(self, event):
         delta = getattr(event, "delta", 0)
         if delta == 0:
             delta = 120 if getattr(event, "num", 0) == 4 else -120
+        if self.view is not None and getattr(event, "state", 0) & 0x4:
+            self.zoom_view(VIEW_ZOOM_STEP if delta > 0 else 1 / VIEW_ZOOM_STEP, event.x, event.y)
+            return
         factor = 1.04 if delta > 0 else 0.96
         self.scale(factor)
 
+    def on_pan_start(self, event):
+        self._pan_from = (event.x, event.y)
+
+    def on_pan(self, event):
+        if self._pan_from is None:
+            return
+        x0, y0 = self._pan_from
+        self._pan_from = (event.x, event.y)
+        self.pan_view(event.x - x0, event.y - y0)
+
+    def pan_view(self, dx, dy):
+        if self.view is None:
+            return
+        self.view.pan(dx, dy)
+        self._request_view()
+
+    def zoom_view(self, factor, sx=None, sy=None):
+        if self.view is None:
+            return
+        if sx is None:
+            sx, sy = self.view.screen_w / 2, self.view.screen_h / 2
+        self.view.zoom_at(factor, sx, sy)
+        self._request_view()
+
+    def on_view_fit(self):
+        if self.view is None:
+            return
+        self.view.resize(self.canvas.winfo_width(), self.canvas.winfo_height())
+        self.view.fit()
+        self._request_view()
+
+    def _request_view(self):
+        # a nézet azonnal változik, a canvas frissítése (létrehozás / törlés / áthelyezés) képkockánként egyszer
+        if self.view is None or self._view_job is not None:
+            return
+        self._view_job = self.root.after(self.input.frame_ms, self._apply_view)
+
+    def _apply_view(self):
+        self._view_job = None
+        if self.view is None:
+            return
+        self.view.resize(self.canvas.winfo_width(), self.canvas.winfo_height())
+        self.game.renderer.refresh()
+
+    def _sync_board(self):
+        # nagy pályához nézetes rajzoló tartozik; méret- vagy módváltáskor a canvas újra csatolódik
+        game = self.game
+        want = (game.width, game.height) if game.board_pairs is not None else None
+        have = (self.view.world_w, self.view.world_h) if self.view is not None else None
+        if want == have:
+            return
+        game.renderer.clear_shapes()
+        self.canvas.delete("bg", "hud")
+        game.attach_canvas(self.canvas)
+        self.view = getattr(game.renderer, "view", None)
+
+    def _set_board(self, width, height, pairs):
+        self.input.flush()
+        game = self.game
+        old = (game.width, game.height, game.board_pairs)
+        try:
+            game.set_board(width, height, pairs)
+            self._sync_board()
+            game.reset()
+        except ValueError as e:
+            game.set_board(*old)
+            self._sync_board()
+            game.reset()
+            messagebox.showerror("Hiba", f"A pálya nem hozható létre:\n{e}")
+        self.refresh_labels()
+
+    def on_large_board(self):
+        w, h, pairs = (self.game.width, self.game.height, self.game.board_pairs) if self.view else LARGE_BOARD
+        text = simpledialog.askstring("Nagy pálya", "Világméret és párok száma (szélesség x magasság, párok):",
+                                      initialvalue=f"{w}x{h}, {pairs}", parent=self.root)
+        if not text:
+            return
+        nums = [int(n) for n in re.findall(r"\d+", text)]
+        if len(nums) != 3 or min(nums) <= 0:
+            messagebox.showerror("Hiba", "Három pozitív egész szám kell, pl. 6400x3600, 200")
+            return
+        self._set_board(*nums)
+
+    def on_normal_board(self):
+        if self.game.board_pairs is not None:
+            self._set_board(1600, 900, None)
+
     def rotate(self, deg):
-        self.game.rotate_active(deg)
+        self.input.rotate(deg)
 
     def scale(self, factor):
-        self.game.scale_active(factor)
+        self.input.scale(factor)
 
     def on_check(self):
+        self.input.flush()
         ok, msg = self.game.check_alignment_batch()
         if ok is None:
             messagebox.showinfo("Info", msg)
@@ -267,35 +689,200 @@ class LPApp:
                 self.game.next_level()
                 self.refresh_labels()
 
+    def on_undo(self):
+        self.input.flush()
+        if self.game.undo():
+            self.refresh_labels()
+
+    def on_redo(self):
+        self.input.flush()
+        if self.game.redo():
+            self.refresh_labels()
+
     def on_reset(self):
         self.game.reset()
         self.refresh_labels()
 
     def on_save(self):
+        self.input.flush()
+        # pillanatkép a Tk szálon; a kódolás és a lemezre írás már a háttérszálon fut
         data = self.game.to_dict()
-        fname = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        fname = filedialog.asksaveasfilename(defaultextension=".lpsave", filetypes=SAVE_FILETYPES)
         if fname:
-            lp_save_json(fname, data)
-            messagebox.showinfo("Mentve", fname)
+            writer = lp_save_json if fname.lower().endswith(".json") else lp_save_binary
+            self.status_var.set(f"Mentés folyamatban: {os.path.basename(fname)}")
+            self.io.submit(writer, fname, data,
+                           on_done=lambda _r: self.status_var.set(f"Mentve: {fname}"),
+                           on_error=lambda e: self._io_error("Mentés", fname, e))
+
+    def _io_error(self, what: str, fname: str, exc: BaseException):
+        self.status_var.set(f"{what} sikertelen: {os.path.basename(fname)}")
+        messagebox.showerror("Hiba", f"{what} sikertelen:\n{fname}\n{exc}")
+
+    def on_restore_autosave(self):
+        # a napló visszajátszása a háttérszálon, az állapot alkalmazása a Tk szálon
+        self.status_var.set("Automatikus mentés visszaállítása folyamatban")
+        self.io.submit(self.journal.recover, on_done=self._apply_autosave,
+                       on_error=lambda e: self._io_error("Visszaállítás", str(AUTOSAVE_PATH), e))
+
+    def _apply_autosave(self, data):
+        if not data:
+            self.status_var.set("")
+            messagebox.showinfo("Info", "Nincs automatikus mentés.")
+            return
+        self.input.flush()
+        self.game.from_dict(data)
+        self._sync_board()
+        self.io.submit(self.journal.snapshot, self.game.to_dict(),
+                       on_error=lambda e: self._io_error("Automatikus mentés", str(AUTOSAVE_PATH), e))
+        self.refresh_labels()
+        self.status_var.set(f"Betöltve: {AUTOSAVE_PATH}")
+        messagebox.showinfo("Betöltve", str(AUTOSAVE_PATH))
 
     def on_load(self):
-        fname = filedialog.askopenfilename(filetypes=[("JSON", "*.json")])
+        fname = filedialog.askopenfilename(filetypes=SAVE_FILETYPES + [("Minden fájl", "*.*")])
         if fname:
-            data = lp_load_json(fname)
-            if data:
-                self.game.from_dict(data)
-                self.game.redraw()
-                self.refresh_labels()
-                messagebox.showinfo("Betöltve", fname)
+            # beolvasás és értelmezés a háttérszálon, az állapot alkalmazása (from_dict) a Tk szálon
+            self.status_var.set(f"Betöltés folyamatban: {os.path.basename(fname)}")
+            self.io.submit(lp_load_json, fname,
+                           on_done=lambda data: self._apply_loaded(fname, data),
+                           on_error=lambda e: self._io_error("Betöltés", fname, e))
+
+    def _apply_loaded(self, fname: str, data):
+        if not data:
+            self._io_error("Betöltés", fname, ValueError("nem olvasható mentés"))
+            return
+        self.input.flush()
+        self.game.from_dict(data)
+        self._sync_board()
+        self.refresh_labels()
+        self.status_var.set(f"Betöltve: {fname}")
+
+    def on_match_mode(self):
+        self.game.set_match_mode("assign" if self.assign_var.get() else "index")
+
+    def on_load_pack(self):
+        fname = filedialog.askopenfilename(filetypes=[("Pályacsomag", "*.lppack *.lppack.json *.json"), ("Minden fájl", "*.*")])
+        if not fname:
+            return
+        # a csomagkezelő csak itt töltődik be, indításkor nem
+        from lp_levelpack import lp_load_pack
+        old = self.game.pack
+        pack = None
+        try:
+            pack = lp_load_pack(fname)
+            self.game.load_pack(pack)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            if pack is not None:
+                pack.close()
+            messagebox.showerror("Hiba", f"A pályacsomag nem tölthető be:\n{e}")
+            return
+        if old is not None:
+            old.close()
+        self.game.reset()
+        self.refresh_labels()
+        messagebox.showinfo("Pályacsomag", fname)
+
+    def toggle_profiler(self):
+        if self.profiler.enabled:
+            self.profile_overlay.hide()
+            self.profiler.uninstrument()
+            return
+        self.profiler.instrument(self.game, LP_PROFILE_GAME, prefix="game.")
+        self.profiler.instrument(self, LP_PROFILE_APP, prefix="app.")
+        self.profiler.instrument(self.input, ("flush",), prefix="input.")
+        self.profiler.instrument_canvas(self.canvas)
+        self.profile_overlay.show()
+
+    def dump_profile(self):
+        fname = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")],
+                                             initialfile="lp_profile.json")
+        if fname:
+            self.profiler.dump(fname, extra={"startup_ms": self.startup.report()})
+            messagebox.showinfo("Profil mentve", fname)
+
+    def toggle_recording(self):
+        if self.recorder is not None:
+            self.input.flush()
+            self.recorder.finish()
+            path, self.recorder = self.recorder.path, None
+            messagebox.showinfo("Felvétel mentve", path)
+            return
+        SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+        path = SESSIONS_DIR / time.strftime("session_%Y%m%d_%H%M%S.lprec")
+        self.input.flush()
+        self.recorder = LPRecorder(str(path))
+        self.recorder.start(self.game)
+
+    def on_spectate(self):
+        # minden nézői ablak külön folyamat; a játék oldalán egyetlen közzétevő szolgálja ki mindet
+        if self.spectator is None:
+            from lp_spectator import LPSpectatorPublisher
+            try:
+                self.spectator = LPSpectatorPublisher(self.game)
+            except OSError as e:
+                messagebox.showerror("Hiba", f"A nézői mód nem indítható:\n{e}")
+                return
+        script = Path(__file__).with_name("lp_spectator.py")
+        try:
+            self._spectators.append(subprocess.Popen([sys.executable, str(script), self.spectator.name]))
+        except OSError as e:
+            messagebox.showerror("Hiba", f"A nézői ablak nem indítható:\n{e}")
+        if self._spectator_job is None:
+            self._publish_spectator()
+
+    def _publish_spectator(self):
+        from lp_spectator import LP_SPEC_PUBLISH_MS
+        self._spectator_job = None
+        # a bezárt nézői ablakok folyamatait begyűjtjük; ha egy sem él, a közzététel leáll
+        self._spectators = [p for p in self._spectators if p.poll() is None]
+        if not self._spectators:
+            self._stop_spectator()
+            return
+        self.spectator.publish()
+        self._spectator_job = self.root.after(max(self.input.frame_ms, LP_SPEC_PUBLISH_MS), self._publish_spectator)
+
+    def _stop_spectator(self):
+        if self._spectator_job is not None:
+            self.root.after_cancel(self._spectator_job)
+            self._spectator_job = None
+        if self.spectator is not None:
+            self.spectator.close()
+            self.spectator = None
 
     def on_exit(self):
+        for proc in self._spectators:
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in self._spectators:
+            try:
+                proc.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        self._spectators = []
+        self._stop_spectator()
+        if self.recorder is not None:
+            self.recorder.finish()
+            self.recorder = None
+        if self.history is not None:
+            try:
+                self.history.close()
+            except sqlite3.Error:
+                pass
+        if self.results is not None:
+            self.results.close()
+        self.io.shutdown()
         self.root.destroy()
 
 
-def run_app():
+def run_app(t0: float | None = None):
+    startup = LPStartupTimer(t0)
+    startup.mark("imports")
     root = tk.Tk()
     root.attributes("-fullscreen", True)
-    app = LPApp(root)
+    startup.mark("tk_root")
+    app = LPApp(root, startup=startup)
     root.mainloop()
 
 
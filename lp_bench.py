@@ -0,0 +1,279 @@
+# CREATED BY Laczi Péter - R9SAAO
+"""
+Mérőkészlet a játékmag forró útvonalaira, kijelző nélkül.
+
+    python lp_bench.py                       # alap pályaméretek: 5, 50, 500, 2000 pár
+    python lp_bench.py --pairs 5 200 --json bench.json
+    python lp_bench.py --compare bench.json  # összevetés egy korábbi futással
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from lp_game import LPGame
+from lp_layout import lp_generate_level
+from lp_stats import LPStats
+
+DEFAULT_PAIRS = (5, 50, 500, 2000)
+
+
+class LPFakeCanvas:
+    # a Tk canvas azon része, amit a játék használ; csak az elemeket számolja
+    def __init__(self, width=1600, height=900):
+        self.width = width
+        self.height = height
+        self.items = {}
+        self._next = 0
+
+    def config(self, **kw):
+        self.width = kw.get("width", self.width)
+        self.height = kw.get("height", self.height)
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def _create(self, kw):
+        self._next += 1
+        self.items[self._next] = kw.get("tags", ())
+        return self._next
+
+    def create_polygon(self, *args, **kw):
+        return self._create(kw)
+
+    def create_oval(self, *args, **kw):
+        return self._create(kw)
+
+    def create_rectangle(self, *args, **kw):
+        return self._create(kw)
+
+    def create_text(self, *args, **kw):
+        return self._create(kw)
+
+    def coords(self, item, *args):
+        pass
+
+    def itemconfig(self, item, **kw):
+        pass
+
+    def tag_raise(self, tag, above=None):
+        pass
+
+    def delete(self, tag):
+        if tag == "all":
+            self.items.clear()
+        elif tag in self.items:
+            del self.items[tag]
+        else:
+            for item in [i for i, tags in self.items.items() if tag in tags]:
+                del self.items[item]
+
+
+def lp_board_size(pairs: int):
+    # annyi hely, hogy a Poisson-mintavétel biztosan elférjen
+    side = int(math.sqrt(pairs) * 260) + 440
+    return max(1600, side), max(900, side)
+
+
+def lp_make_game(pairs: int, seed: int = 1234):
+    w, h = lp_board_size(pairs)
+    game = LPGame(width=w, height=h, level_count=5, stats=LPStats(total_levels=5), seed=seed)
+    game.attach_canvas(LPFakeCanvas(w, h))
+    game.level = 5
+    targets, actives = lp_generate_level(5, random.Random(seed), w, h, pairs)
+    game.from_dict({
+        "level": 5,
+        "width": w,
+        "height": h,
+        "active": [s.as_dict() for s in actives],
+        "target": [s.as_dict() for s in targets],
+    })
+    return game
+
+
+def _measure(fn, min_time: float, max_calls: int = 1_000_000):
+    samples = []
+    clock = time.perf_counter_ns
+    # bemelegítés (gyorsítótárak, lusta importok), nem számít bele a mérésbe
+    fn()
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_calls:
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+        if len(samples) % 16 == 0 and time.perf_counter() >= deadline:
+            break
+    samples.sort()
+    total = sum(samples)
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(p * len(samples)))] / 1000.0
+
+    return {
+        "calls": len(samples),
+        "ops_per_sec": len(samples) / (total / 1e9) if total else float("inf"),
+        "p50_us": pct(0.50),
+        "p99_us": pct(0.99),
+    }
+
+
+def _cases(pairs: int, seed: int):
+    game = lp_make_game(pairs, seed)
+    rng = random.Random(seed)
+    shapes = list(game.active_shapes)
+    sh = shapes[0]
+
+    def polygon_cold():
+        sh.rotation = sh.rotation + 1.0
+        sh.polygon()
+
+    def contains():
+        s = shapes[rng.randrange(len(shapes))]
+        s.contains(s.cx + rng.uniform(-s.size, s.size), s.cy + rng.uniform(-s.size, s.size))
+
+    def pointer_down():
+        s = shapes[rng.randrange(len(shapes))]
+        game.pointer_down(s.cx, s.cy)
+        game.selected_ids.clear()
+
+    game.snap_radius = -1.0
+    game.pointer_down(sh.cx, sh.cy)
+    drag_id = game._drag_id
+    w, h = game.width, game.height
+
+    def drag_to():
+        game._drag_id = drag_id
+        game.drag_to(rng.uniform(0, w), rng.uniform(0, h))
+
+    # külön játék, amelyen a köteg a pálya szélességével a célja mellett áll: minden ellenőrzés sikertelen,
+    # így egy alakzat sem tűnik el a mérés közben (a drag_to sem tolhatja a célra)
+    check_game = lp_make_game(pairs, seed)
+    batch = sorted(check_game.active_shapes.ids)[:check_game.required_batch()]
+    for sid in batch:
+        check_game.active_shapes[sid].cx = check_game.target_shapes[sid].cx + check_game.width
+
+    def check_alignment_batch():
+        check_game.selected_ids = set(batch)
+        check_game.lives = 3
+        check_game.check_alignment_batch()
+
+    def score_board():
+        game.score_pairs()
+
+    state = game.to_dict()
+    state_json = json.dumps(state)
+
+    def to_dict():
+        game.to_dict()
+
+    def from_dict():
+        game.from_dict(json.loads(state_json))
+
+    def generate_level():
+        lp_generate_level(5, random.Random(rng.random()), game.width, game.height, pairs)
+
+    # nagy pálya nézettel: pásztázáskor csak a látható alakzatok elemei jönnek létre / törlődnek
+    view_game = lp_make_game(pairs, seed)
+    view_game.board_pairs = pairs
+    view_game.attach_canvas(LPFakeCanvas())
+    view_renderer = view_game.renderer
+
+    def view_pan():
+        view_renderer.view.pan(rng.uniform(-300, 300), rng.uniform(-300, 300))
+        view_renderer.refresh()
+
+    cases = [
+        ("polygon_cold", polygon_cold),
+        ("polygon_cached", sh.polygon),
+        ("contains", contains),
+        ("pointer_down", pointer_down),
+        ("drag_to", drag_to),
+        ("check_alignment_batch", check_alignment_batch),
+        ("score_board", score_board),
+        ("to_dict", to_dict),
+        ("from_dict", from_dict),
+        ("generate_level", generate_level),
+        ("view_pan", view_pan),
+    ]
+    if pairs <= 5:
+        stock = LPGame(width=1600, height=900, level_count=5, stats=LPStats(total_levels=5), seed=seed)
+        stock.attach_canvas(LPFakeCanvas())
+        stock.level = pairs
+
+        cases.append(("new_level", stock.new_level))
+    return cases
+
+
+def lp_run_bench(pairs_list=DEFAULT_PAIRS, min_time: float = 0.3, seed: int = 1234, only=None):
+    results = []
+    for pairs in pairs_list:
+        for name, fn in _cases(pairs, seed):
+            if only and name not in only:
+                continue
+            row = {"name": name, "pairs": pairs}
+            row.update(_measure(fn, min_time))
+            results.append(row)
+            print(f"{name:<24}{pairs:>6}  {row['ops_per_sec']:>12.1f} op/s"
+                  f"  p50 {row['p50_us']:>10.1f} µs  p99 {row['p99_us']:>10.1f} µs", flush=True)
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def lp_compare(old: dict, new: dict):
+    before = {(r["name"], r["pairs"]): r for r in old.get("results", [])}
+    print(f"\n{'eset':<24}{'pár':>6}  {'előtte op/s':>12}  {'most op/s':>12}  {'arány':>7}")
+    for r in new["results"]:
+        prev = before.get((r["name"], r["pairs"]))
+        if not prev:
+            continue
+        ratio = r["ops_per_sec"] / prev["ops_per_sec"] if prev["ops_per_sec"] else float("inf")
+        print(f"{r['name']:<24}{r['pairs']:>6}  {prev['ops_per_sec']:>12.1f}  {r['ops_per_sec']:>12.1f}  {ratio:>6.2f}x")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LP Shape Evolution – forró útvonalak mérése")
+    ap.add_argument("--pairs", type=int, nargs="+", default=list(DEFAULT_PAIRS))
+    ap.add_argument("--min-time", type=float, default=0.3, help="mérési idő esetenként [s]")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--only", nargs="+", help="csak ezek az esetek")
+    ap.add_argument("--json", help="eredmények mentése ide (JSON)")
+    ap.add_argument("--compare", help="korábbi JSON eredmény az összevetéshez")
+    args = ap.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "min_time": args.min_time,
+            "seed": args.seed,
+        },
+        "results": lp_run_bench(args.pairs, args.min_time, args.seed, args.only),
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            lp_compare(json.load(f), report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
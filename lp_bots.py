@@ -0,0 +1,295 @@
+# CREATED BY Laczi Péter - R9SAAO
+"""
+Kijelző nélküli bot-játékosok és verseny folyamatkészleten, terheléses és egyensúlyi teszteléshez.
+
+    python lp_bots.py --games 200                                   # minden bot, minden nehézség
+    python lp_bots.py --bots casual sloppy --difficulty hard --snap 30 --thresholds 40 18 0.22
+
+A botok csak a játék nyilvános műveleteit használják (pointer_down, drag_to, pointer_up, rotate_active,
+scale_active, check_alignment_batch, next_level). A szintidő egy egyszerű emberi mozgásmodellből (Fitts-törvény,
+billentyű- és görgetésszám) becsült idő, nem a szimuláció falióra-ideje.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+
+from lp_game import LPGame
+from lp_stats import LPStats
+
+# pozíciószórás [px], forgatásszórás [fok], méretszórás [arány]
+LP_BOT_PROFILES = {
+    "perfect": (0.0, 0.0, 0.0),
+    "expert": (4.0, 2.0, 0.02),
+    "casual": (15.0, 6.0, 0.06),
+    "sloppy": (35.0, 12.0, 0.12),
+}
+LP_DIFFICULTIES = ("easy", "normal", "hard")
+
+
+class LPBot:
+    # egy játékos: minden alakzatot egyenként a helyére húz, forgat, méretez, majd kijelöli a köteget és ellenőriz
+    def __init__(self, profile: str = "casual", rng: random.Random | None = None, drag_steps: int = 4):
+        self.profile = profile
+        self.pos_sigma, self.rot_sigma, self.scale_sigma = LP_BOT_PROFILES[profile]
+        self.rng = rng or random.Random()
+        self.drag_steps = drag_steps
+        self.seconds = 0.0
+
+    def _grab_point(self, game, sid):
+        # olyan pont, ahol a találatvizsgálat ezt az alakzatot adja (átfedésnél nem mindig a középpont)
+        sh = game.active_shapes[sid]
+        if game.shape_at(sh.cx, sh.cy) == sid:
+            return sh.cx, sh.cy
+        poly = sh.polygon()
+        xs, ys = poly[0::2], poly[1::2]
+        # csúcsok és oldalfelezők felé, egyre kijjebb
+        pts = list(zip(xs, ys)) + [((xs[i] + xs[i - 1]) / 2, (ys[i] + ys[i - 1]) / 2) for i in range(len(xs))]
+        for f in (0.35, 0.6, 0.85):
+            for px, py in pts:
+                x = sh.cx + f * (px - sh.cx)
+                y = sh.cy + f * (py - sh.cy)
+                if game.shape_at(x, y) == sid:
+                    return x, y
+        return None
+
+    def _adjust(self, game, sid) -> bool:
+        # csak ez az alakzat legyen a forgatás/méretezés célja: kijelölés, majd azonnali visszavonás (a fókusz marad)
+        p = self._grab_point(game, sid)
+        if p is None:
+            return False
+        game.pointer_down(*p)
+        if sid in game.selected_ids:
+            game.pointer_down(*p)
+        sh = game.active_shapes[sid]
+        t = game.target_shapes[sid]
+        ox, oy = p[0] - sh.cx, p[1] - sh.cy
+        gx = t.cx + self.rng.gauss(0.0, self.pos_sigma) + ox
+        gy = t.cy + self.rng.gauss(0.0, self.pos_sigma) + oy
+        dist = math.hypot(gx - p[0], gy - p[1])
+        for k in range(1, self.drag_steps + 1):
+            f = k / self.drag_steps
+            game.drag_to(p[0] + (gx - p[0]) * f, p[1] + (gy - p[1]) * f)
+        game.pointer_up(gx, gy)
+
+        delta = (t.rotation - sh.rotation + 180.0) % 360.0 - 180.0 + self.rng.gauss(0.0, self.rot_sigma)
+        if delta:
+            game.rotate_active(delta)
+        want = t.size * (1.0 + self.rng.gauss(0.0, self.scale_sigma))
+        factor = (want + 0.5) / sh.size
+        if int(sh.size * factor) != sh.size:
+            game.scale_active(factor)
+
+        # mozgásmodell: reakcióidő + Fitts-féle húzás + A/D lenyomások (10°) + görgetés (5%)
+        self.seconds += 0.4 + 0.1 + 0.15 * math.log2(1.0 + dist / max(sh.size, 1))
+        self.seconds += 0.08 * abs(delta) / 10.0
+        self.seconds += 0.05 * abs(math.log(max(factor, 1e-6)) / math.log(1.05))
+        return True
+
+    def _adjust_batch(self, game, need):
+        # mint egy ember: a teljesen letakart alakzatokat akkor fogja meg, ha a fölöttük lévők már elmozdultak
+        done = []
+        while len(done) < need:
+            for sid in sorted(game.active_shapes.ids):
+                if sid not in done and self._adjust(game, sid):
+                    done.append(sid)
+                    break
+            else:
+                return None
+        return done
+
+    def _select(self, game, ids) -> bool:
+        for sid in ids:
+            if sid in game.selected_ids:
+                continue
+            p = self._grab_point(game, sid)
+            if p is None:
+                return False
+            game.pointer_down(*p)
+            game.pointer_up(*p)
+            self.seconds += 0.25
+        return game.selected_ids == set(ids)
+
+    def _deselect(self, game):
+        for sid in list(game.selected_ids):
+            p = self._grab_point(game, sid)
+            if p is not None:
+                game.pointer_down(*p)
+                game.pointer_up(*p)
+
+    def play_level(self, game) -> dict:
+        lives = game.lives
+        self.seconds = 0.0
+        checks = 0
+        stuck = False
+        while len(game.active_shapes) and game.lives > 0:
+            self._deselect(game)
+            batch = self._adjust_batch(game, game.required_batch())
+            if batch is None or not self._select(game, batch):
+                stuck = True
+                break
+            ok, _msg = game.check_alignment_batch()
+            checks += 1
+            self.seconds += 0.3
+            if ok is None:
+                stuck = True
+                break
+        return {
+            "cleared": not len(game.active_shapes),
+            "lives_lost": lives - game.lives,
+            "seconds": self.seconds,
+            "checks": checks,
+            "stuck": stuck,
+        }
+
+
+def lp_play_game(bot: LPBot, game: LPGame):
+    # egy teljes játék az első szinttől a győzelemig vagy az életek elfogyásáig
+    game.reset()
+    levels = []
+    while True:
+        res = bot.play_level(game)
+        res["level"] = game.level
+        levels.append(res)
+        if not res["cleared"] or game.level >= game.level_count:
+            break
+        game.next_level()
+    return levels
+
+
+def _empty_summary():
+    # stuck: a bot elakadt (nem tudott megfogni egy alakzatot), ez nem vereség
+    return {"games": 0, "wins": 0, "stuck": 0, "levels": {}, "wall_seconds": 0.0}
+
+
+def _merge(dst: dict, src: dict):
+    dst["games"] += src["games"]
+    dst["wins"] += src["wins"]
+    dst["stuck"] += src["stuck"]
+    dst["wall_seconds"] += src["wall_seconds"]
+    for level, row in src["levels"].items():
+        acc = dst["levels"].setdefault(level, {"plays": 0, "cleared": 0, "lives_lost": 0, "seconds": 0.0,
+                                               "checks": 0, "stuck": 0})
+        for key, value in row.items():
+            acc[key] += value
+
+
+def _run_job(job):
+    # munkás: games darab játék ugyanazzal a bottal és beállításokkal
+    profile, difficulty, seed, games, snap_radius, thresholds = job
+    rng = random.Random(seed)
+    bot = LPBot(profile, random.Random(rng.getrandbits(64)))
+    summary = _empty_summary()
+    t0 = time.perf_counter()
+    for _ in range(games):
+        game = LPGame(width=1600, height=900, level_count=5, stats=LPStats(total_levels=5),
+                      seed=rng.getrandbits(32))
+        game.set_difficulty(difficulty)
+        if snap_radius is not None:
+            game.snap_radius = snap_radius
+        # a felülírás csak ehhez a játékhoz tartozik, a modul LP_THRESHOLDS táblája érintetlen marad
+        if thresholds is not None:
+            game.thresholds = tuple(thresholds)
+        levels = lp_play_game(bot, game)
+        summary["games"] += 1
+        if levels[-1]["stuck"]:
+            summary["stuck"] += 1
+        else:
+            summary["wins"] += int(levels[-1]["cleared"] and levels[-1]["level"] >= game.level_count)
+        for res in levels:
+            _merge(summary, {"games": 0, "wins": 0, "stuck": 0, "wall_seconds": 0.0, "levels": {res["level"]: {
+                "plays": 1, "cleared": int(res["cleared"]), "lives_lost": res["lives_lost"],
+                "seconds": res["seconds"], "checks": res["checks"], "stuck": int(res["stuck"])}}})
+    summary["wall_seconds"] = time.perf_counter() - t0
+    return (profile, difficulty), summary
+
+
+def lp_tournament(bots=tuple(LP_BOT_PROFILES), difficulties=LP_DIFFICULTIES, games: int = 100, seed: int = 1,
+                  workers: int | None = None, chunk: int = 25, snap_radius: float | None = None,
+                  thresholds=None) -> dict:
+    # {(bot, nehézség): összesítés}; a játékok chunk méretű feladatokban oszlanak szét a folyamatok között
+    jobs = []
+    rng = random.Random(seed)
+    for profile in bots:
+        for difficulty in difficulties:
+            for start in range(0, games, chunk):
+                jobs.append((profile, difficulty, rng.getrandbits(64), min(chunk, games - start),
+                             snap_radius, thresholds))
+    results = {}
+    if workers == 1:
+        done = map(_run_job, jobs)
+        for key, summary in done:
+            _merge(results.setdefault(key, _empty_summary()), summary)
+        return results
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for key, summary in pool.map(_run_job, jobs):
+            _merge(results.setdefault(key, _empty_summary()), summary)
+    return results
+
+
+def lp_report(results: dict) -> list:
+    rows = []
+    for (profile, difficulty), s in sorted(results.items()):
+        per_level = {}
+        for level, row in sorted(s["levels"].items()):
+            # az elakadt szintek külön számítanak, az arányok csak a végigjátszott szintekre vonatkoznak
+            played = row["plays"] - row["stuck"]
+            per_level[level] = {
+                "plays": row["plays"],
+                "clear_rate": row["cleared"] / played if played else 0.0,
+                "lives_lost": row["lives_lost"] / played if played else 0.0,
+                "seconds": row["seconds"] / played if played else 0.0,
+                "stuck": row["stuck"],
+            }
+        finished = s["games"] - s["stuck"]
+        rows.append({
+            "bot": profile,
+            "difficulty": difficulty,
+            "games": s["games"],
+            "stuck": s["stuck"],
+            "win_rate": s["wins"] / finished if finished else 0.0,
+            "levels": per_level,
+        })
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LP Shape Evolution – bot verseny")
+    ap.add_argument("--bots", nargs="+", default=list(LP_BOT_PROFILES), choices=sorted(LP_BOT_PROFILES))
+    ap.add_argument("--difficulty", nargs="+", default=list(LP_DIFFICULTIES), choices=LP_DIFFICULTIES)
+    ap.add_argument("--games", type=int, default=100, help="játékok száma botonként és nehézségenként")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=None, help="folyamatok száma (alapból a magok száma)")
+    ap.add_argument("--snap", type=float, help="snap_radius felülírása [px]")
+    ap.add_argument("--thresholds", type=float, nargs=3, metavar=("POS", "ROT", "SCALE"),
+                    help="tűréshatárok felülírása a választott nehézség(ek)hez")
+    ap.add_argument("--json", help="eredmények mentése ide (JSON)")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    results = lp_tournament(args.bots, args.difficulty, args.games, args.seed, args.workers,
+                            snap_radius=args.snap, thresholds=args.thresholds)
+    wall = time.perf_counter() - t0
+    report = lp_report(results)
+    levels = sum(row["plays"] for s in results.values() for row in s["levels"].values())
+
+    print(f"{'bot':<9}{'nehézség':<10}{'győzelem':>9}{'elakadt':>9}   "
+          f"szintenként: teljesítés / elvesztett élet / idő [s]")
+    for r in report:
+        cells = "  ".join(f"{lv}: {row['clear_rate']:.0%} {row['lives_lost']:.2f} {row['seconds']:.1f}"
+                          for lv, row in r["levels"].items())
+        print(f"{r['bot']:<9}{r['difficulty']:<10}{r['win_rate']:>8.1%}{r['stuck']:>9}   {cells}")
+    print(f"\n{levels} szint {wall:.1f} s alatt ({levels / wall:.0f} szint/s, "
+          f"{levels / wall * 3600 / 1e6:.2f} millió szint/óra, {args.workers or os.cpu_count()} folyamat)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "levels_per_sec": levels / wall, "results": report}, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+# CREATED BY Laczi Péter - R9SAAO
+"""
+Eredménygyűjtő szolgáltatás több játékpéldányhoz (asyncio, JSON sorok TCP-n).
+
+    python lp_collector.py --port 8765 --db results.sqlite3     # szerver
+    LP_COLLECTOR=127.0.0.1:8765 python main.py                  # a játék ide küldi a teljesített szinteket
+
+Kérések (soronként egy JSON):
+    {"op": "submit", "records": [...]}                              -> {"ok": true, "stored": n}
+                                      adatbázis-hibánál (újraküldhető)  -> {"ok": false, "error": ..., "retry": true}
+    {"op": "leaderboard", "difficulty": "normal", "level": 3}       -> {"ok": true, "rows": [[játékos, idő], ...]}
+    {"op": "percentile", "player": "...", "difficulty": "...", "level": 3}
+    {"op": "summary", "player": "...", "difficulty": "..."}
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+from lp_history import LPHistoryStore
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+_MAX_LINE = 4 * 1024 * 1024
+
+
+def lp_level_record(stats: dict, player_name: str, difficulty: str, level: int, session: str) -> dict:
+    # egy teljesített szint rekordja az LPStats.as_dict() kimenetéből
+    lives_lost = stats.get("lives_lost") or []
+    return {
+        "uid": uuid.uuid4().hex,
+        "session": session,
+        "player": player_name,
+        "difficulty": difficulty,
+        "level": int(level),
+        "seconds": float(stats["elapsed"][level]),
+        "attempts": int(stats["attempts"][level]),
+        "lives_lost": int(lives_lost[level]) if level < len(lives_lost) else 0,
+        "finished": time.time(),
+    }
+
+
+class LPCollector:
+    # a beküldött rekordokat kötegben írja; a választ csak a köteg lemezre kerülése után küldi el
+    # flush_ms: ennyit vár az első beküldés után, hogy az addig érkezők egy tranzakcióba kerüljenek
+    def __init__(self, store: LPHistoryStore, flush_ms: float = 2.0):
+        self.store = store
+        self.flush_interval = flush_ms / 1000.0
+        self.received = 0
+        self.server = None
+        self._sessions = {}
+        self._flushed = None
+        self._wake = None
+        self._flusher = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self._flushed = asyncio.get_running_loop().create_future()
+        self._wake = asyncio.Event()
+        self.server = await asyncio.start_server(self._handle, host, port, limit=_MAX_LINE)
+        self._flusher = asyncio.create_task(self._flush_loop())
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        self._flush()
+
+    def _flush(self):
+        try:
+            self.store.flush()
+        except sqlite3.Error as e:
+            # zárolt / betelt adatbázis: a várakozók hibát kapnak (a kliens újraküld), a hurok fut tovább
+            self._resolve(e)
+        else:
+            self._resolve(None)
+
+    def _resolve(self, exc: BaseException | None):
+        done, self._flushed = self._flushed, asyncio.get_running_loop().create_future()
+        if done is None or done.done():
+            return
+        if exc is None:
+            done.set_result(None)
+        else:
+            done.set_exception(exc)
+            # várakozó nélkül se legyen "never retrieved" figyelmeztetés; az await így is megkapja a hibát
+            done.exception()
+
+    async def _flush_loop(self):
+        while True:
+            await self._wake.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+
+    def _session_id(self, session: str, player: str, difficulty: str) -> int:
+        key = (session, player, difficulty)
+        sid = self._sessions.get(key)
+        if sid is None:
+            sid = self._sessions[key] = self.store.start_session(player, difficulty)
+        return sid
+
+    async def _submit(self, records) -> dict:
+        # előbb a teljes köteg ellenőrzése és átalakítása: vagy minden rekord bekerül, vagy egyik sem
+        if not isinstance(records, list):
+            raise TypeError("a records mező nem lista")
+        rows = []
+        for rec in records:
+            if not isinstance(rec, dict):
+                raise TypeError("a rekord nem JSON objektum")
+            finished = rec.get("finished")
+            uid = rec.get("uid")
+            rows.append((str(rec.get("session") or ""), str(rec["player"]), str(rec["difficulty"]),
+                         int(rec["level"]), float(rec["seconds"]), int(rec.get("attempts", 1)),
+                         int(rec.get("lives_lost", 0)), float(finished) if finished else None,
+                         str(uid) if uid is not None else None))
+        try:
+            for session, *row in rows:
+                self.store.record_level(self._session_id(session, row[0], row[1]), *row)
+        except sqlite3.Error as e:
+            # a köteg méret szerinti kiírása is itt bukhat el: a többi várakozó is hibát kap
+            self._resolve(e)
+            return {"ok": False, "error": str(e), "retry": True}
+        self.received += len(rows)
+        self._wake.set()
+        try:
+            await asyncio.shield(self._flushed)
+        except sqlite3.Error as e:
+            return {"ok": False, "error": str(e), "retry": True}
+        return {"ok": True, "stored": len(rows)}
+
+    def _query(self, req: dict) -> dict:
+        op = req["op"]
+        if op == "leaderboard":
+            rows = self.store.leaderboard(req["difficulty"], int(req["level"]), int(req.get("limit", 10)))
+            return {"ok": True, "rows": [list(r) for r in rows]}
+        if op == "percentile":
+            pct = self.store.player_percentile(req["player"], req["difficulty"], int(req["level"]))
+            return {"ok": True, "percentile": pct}
+        if op == "summary":
+            return {"ok": True, "levels": self.store.player_summary(req["player"], req.get("difficulty"))}
+        raise ValueError(f"ismeretlen művelet: {op}")
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                    if req.get("op") == "submit":
+                        reply = await self._submit(req["records"])
+                    else:
+                        reply = self._query(req)
+                except (ValueError, KeyError, TypeError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+
+class LPCollectorThread:
+    # a gyűjtőt saját eseményhurokkal, háttérszálon futtatja (helyi teszteléshez, beágyazáshoz)
+    def __init__(self, db_path: str = ":memory:", host: str = DEFAULT_HOST, port: int = 0, **kw):
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self.kw = kw
+        self.address = None
+        self.collector = None
+        self._loop = None
+        self._stop = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lp-collector", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self.address
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        # az SQLite kapcsolat szálhoz kötött, ezért itt nyitjuk meg
+        store = LPHistoryStore(self.db_path)
+        self.collector = LPCollector(store, **self.kw)
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self.address = await self.collector.start(self.host, self.port)
+        self._ready.set()
+        await self._stop.wait()
+        await self.collector.close()
+        store.close()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join()
+
+
+def lp_request(host: str, port: int, req: dict, timeout: float = 5.0) -> dict:
+    # egyszeri, blokkoló kérés (lekérdezésekhez, parancssorból)
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(json.dumps(req, ensure_ascii=False).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("a gyűjtő bontotta a kapcsolatot")
+    return json.loads(line)
+
+
+class LPResultClient:
+    # nem blokkoló beküldés: a submit csak sorba tesz, a küldés háttérszálon, kötegelve, újrapróbálva fut
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, batch_size: int = 64,
+                 max_queue: int = 10000, timeout: float = 5.0, max_backoff: float = 30.0):
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.sent = 0
+        self.dropped = 0
+        self.failures = 0
+        self._queue = collections.deque()
+        self._inflight = 0
+        self._max_queue = max_queue
+        self._cond = threading.Condition()
+        self._closing = False
+        self._sock = None
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="lp-result-client", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict):
+        with self._cond:
+            if len(self._queue) >= self._max_queue:
+                # tele a sor (sokáig elérhetetlen gyűjtő): a legrégebbi rekord vész el
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(record)
+            self._cond.notify()
+
+    def pending(self) -> int:
+        # a sorban állók és az éppen küldés alatt álló köteg
+        with self._cond:
+            return len(self._queue) + self._inflight
+
+    def close(self, timeout: float = 2.0):
+        # kilépéskor még megpróbálja elküldeni a sorban állókat, legfeljebb timeout másodpercig
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._disconnect()
+
+    def _connect(self):
+        if self._sock is None:
+            self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._file = self._sock.makefile("rb")
+
+    def _disconnect(self):
+        for obj in (self._file, self._sock):
+            if obj is not None:
+                try:
+                    obj.close()
+                except OSError:
+                    pass
+        self._sock = None
+        self._file = None
+
+    def _send(self, batch) -> bool:
+        try:
+            self._connect()
+            self._sock.sendall(json.dumps({"op": "submit", "records": batch}, ensure_ascii=False).encode("utf-8") + b"\n")
+            line = self._file.readline()
+            if not line:
+                raise ConnectionError("a gyűjtő bontotta a kapcsolatot")
+            reply = json.loads(line)
+        except (OSError, ValueError):
+            self._disconnect()
+            return False
+        # hibás rekordot nem küldünk újra, az újrapróbálás csak átmeneti (pl. adatbázis-) hibán segít
+        return bool(reply.get("ok")) or ("error" in reply and not reply.get("retry"))
+
+    def _run(self):
+        backoff = 0.25
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._inflight = len(batch)
+            ok = self._send(batch)
+            with self._cond:
+                self._inflight = 0
+            if ok:
+                self.sent += len(batch)
+                backoff = 0.25
+                continue
+            self.failures += 1
+            with self._cond:
+                # a sikertelen köteg visszakerül a sor elejére
+                self._queue.extendleft(reversed(batch))
+                while len(self._queue) > self._max_queue:
+                    self._queue.popleft()
+                    self.dropped += 1
+                if self._closing:
+                    return
+                # exponenciális visszalépés; close() felébreszti
+                self._cond.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LP Shape Evolution – eredménygyűjtő szolgáltatás")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--db", default="lp_results.sqlite3", help="SQLite adatbázis")
+    ap.add_argument("--flush-ms", type=float, default=2.0, help="kötegelés várakozási ideje [ms]")
+    args = ap.parse_args(argv)
+
+    async def serve():
+        store = LPHistoryStore(args.db)
+        collector = LPCollector(store, flush_ms=args.flush_ms)
+        host, port = await collector.start(args.host, args.port)
+        print(f"gyűjtő fut: {host}:{port} ({args.db})", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await collector.close()
+            store.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
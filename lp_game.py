@@ -1,31 +1,68 @@
 # CREATED BY Laczi Péter - R9SAAO
 
 import random
-from lp_shapes import LPShape, lp_draw_shape, lp_draw_ghost_shape
-from lp_utils import lp_deg_norm, lp_distance
+from lp_layout import LP_MAX_PAIRS, lp_generate_level, lp_level_pairs, lp_level_seed
+from lp_render import LPNullRenderer, LPTkRenderer, LPViewport, LPViewportRenderer
+from lp_savefile import lp_decode_save
+from lp_shapes import LPShape, LPShapeTable
+from lp_spatial import LPSpatialGrid
+from lp_undo import LP_UNDO_CAP, LPUndoHistory, lp_record_shape, lp_set_shape_state, lp_shape_record, lp_shape_state
+from lp_utils import LP_THRESHOLDS, lp_deg_norm, lp_distance, lp_pair_errors
+
+# eddig a párszámig az ellenőrzés skalárisan fut: kis kijelölésnél a tömbépítés drágább, mint a ciklus,
+# és így a normál játékhoz nem kell NumPy
+LP_SCALAR_PAIRS = 16
 
 
 class LPGame:
-    def __init__(self, width: int, height: int, level_count: int, stats):
+    def __init__(self, width: int, height: int, level_count: int, stats, seed: int | None = None,
+                 undo_cap: int = LP_UNDO_CAP):
         self.width = width
         self.height = height
         self.level_count = level_count
         self.stats = stats
-        self.canvas = None
+        self.renderer = LPNullRenderer()
         self.level = 1
         self.lives = 3
         self.player_name = "Névtelen"
-        self.active_shapes = []
-        self.target_shapes = []
-        self.selected_indices = set()
-        self.focus_index = None
-        self._drag_index = None
+        # az aktív és a cél alakzat párja azonos azonosítót kap a két táblában
+        self.active_shapes = LPShapeTable()
+        self.target_shapes = LPShapeTable()
+        self._grid = LPSpatialGrid()
+        # a célok középpontjai, az "assign" módú illesztés jelöltjeihez
+        self._target_grid = LPSpatialGrid()
+        # "index": az aktív alakzat csak az azonos azonosítójú célhoz illeszthető
+        # "assign": a kijelöltek a legkisebb összhibájú szabad célokhoz rendelődnek
+        self.match_mode = "index"
+        self.selected_ids = set()
+        self.focus_id = None
+        self._drag_id = None
         self._drag_offset = (0, 0)
         self.difficulty = "normal"
         self.snap_radius = 45.0
-        random.seed()
+        # a tűréshatárok felülírása (pl. bot-hangoláshoz); None: a nehézség szerinti LP_THRESHOLDS
+        self.thresholds = None
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(32)
+        self.rng = random.Random(lp_level_seed(self.seed, self.level))
+        self.recorder = None
+        # előre generált pályák (lp_levelpack: LPLevelPack / LPLevelPackFile); None: véletlen generálás
+        self.pack = None
+        # nagy pálya: szintenként ennyi pár tetszőleges méretű világon; None: min(szint, LP_MAX_PAIRS)
+        self.board_pairs = None
+        # visszavonás/újra: csak a módosult alakzatok állapota tárolódik, a húzás egy lépés
+        self.undo_history = LPUndoHistory(undo_cap)
+
+    def load_pack(self, pack):
+        if isinstance(pack, dict):
+            from lp_levelpack import LPLevelPack
+            pack = LPLevelPack(pack)
+        if pack is not None and (pack.width > self.width or pack.height > self.height):
+            raise ValueError(f"a pályacsomag ({pack.width}x{pack.height}) nem fér el a pályán")
+        self.pack = pack
 
     def set_difficulty(self, diff: str):
+        if self.recorder:
+            self.recorder.event("set_difficulty", diff)
         if diff not in ("easy", "normal", "hard"):
             diff = "normal"
         self.difficulty = diff
@@ -36,9 +73,31 @@ class LPGame:
         else:
             self.snap_radius = 45.0
 
+    def set_board(self, width: int, height: int, pairs: int | None = None):
+        # a következő new_level-től érvényes; pairs=None a normál, szintenként bővülő pálya
+        if self.recorder:
+            self.recorder.event("set_board", f"{int(width)}x{int(height)}:{int(pairs or 0)}")
+        self.width = int(width)
+        self.height = int(height)
+        self.board_pairs = int(pairs) if pairs else None
+
+    def set_match_mode(self, mode: str):
+        if self.recorder:
+            self.recorder.event("set_match_mode", mode)
+        self.match_mode = mode if mode in ("index", "assign") else "index"
+
     def attach_canvas(self, canvas):
-        self.canvas = canvas
-        self.canvas.config(width=self.width, height=self.height)
+        if self.board_pairs is None:
+            canvas.config(width=self.width, height=self.height)
+            self.attach_renderer(LPTkRenderer(canvas))
+            return
+        # nagy pálya: a canvas csak egy ablak a világra; kezdetben 1:1 nagyítás a világ közepén
+        view = LPViewport(self.width, self.height, canvas.winfo_width(), canvas.winfo_height())
+        view.center_on(self.width / 2, self.height / 2)
+        self.attach_renderer(LPViewportRenderer(canvas, view))
+
+    def attach_renderer(self, renderer):
+        self.renderer = renderer
         self.redraw()
 
     def reset(self):
@@ -54,245 +113,409 @@ class LPGame:
         return len(self.active_shapes) == 0
 
     def required_batch(self):
-        return min(self.level, 5, max(1, len(self.active_shapes)))
+        # a köteget a játékos kézzel jelöli ki, ezért nagy pályán is legfeljebb LP_MAX_PAIRS (szándékos);
+        # ott viszont a szinttől függetlenül mindig a teljes köteg, nem az első szinten egyesével
+        if self.board_pairs is not None:
+            return min(LP_MAX_PAIRS, max(1, len(self.active_shapes)))
+        return min(self.level, LP_MAX_PAIRS, max(1, len(self.active_shapes)))
 
-    def new_level(self):
-        if not self.canvas:
-            return
-        self.canvas.delete("all")
-        self._draw_background()
-        self._draw_center_circle()
-
-        cw = max(self.canvas.winfo_width(), self.width)
-        ch = max(self.canvas.winfo_height(), self.height)
+    def level_pairs(self):
+        if self.board_pairs is not None:
+            return self.board_pairs
+        return lp_level_pairs(self.level)
 
-        pairs = min(self.level, 5)
-        sides = min(3 + (self.level - 1), 7)
-        self.active_shapes.clear()
-        self.target_shapes.clear()
-        self.selected_indices.clear()
-        self.focus_index = None
-        self._drag_index = None
-
-        centers = []
-        min_dist = 140
-        for _ in range(pairs):
-            for _try in range(200):
-                x = random.randint(220, cw - 220)
-                y = random.randint(160, ch - 160)
-                if all(lp_distance((x, y), c) >= min_dist for c in centers):
-                    centers.append((x, y))
-                    break
-
-        for cx, cy in centers:
-            target_size = random.randint(100, 150)
-            trot = random.randint(0, 359)
-            self.target_shapes.append(LPShape(cx=cx, cy=cy, size=target_size, rotation=trot, sides=sides, color="#3fb950"))
-            self.active_shapes.append(
-                LPShape(
-                    cx=cx + random.randint(-180, 180),
-                    cy=cy + random.randint(-140, 140),
-                    size=int(target_size * random.uniform(0.75, 1.25)),
-                    rotation=(trot + random.randint(-70, 70)) % 360,
-                    sides=sides,
-                    color="#6cb6ff"
-                )
+    def new_level(self):
+        # a pálya csak a magtól és a játék méretétől függ, az ablakmérettől nem
+        self.rng = random.Random(lp_level_seed(self.seed, self.level))
+        boards = self.pack.count(self.level) if self.pack is not None else 0
+        if boards:
+            # a csomagból is a mag szerint választunk; csak ennek az egy pályának a rekordjai dekódolódnak
+            targets, actives = self.pack.board(self.level, self.rng.randrange(boards))
+        if self.recorder:
+            if boards:
+                # a csomag nincs a felvételben: a kiválasztott pálya maga kerül bele, a szintváltás elé
+                self.recorder.event("pack_board", {
+                    "count": boards,
+                    "target": [t.as_dict() for t in targets],
+                    "active": [a.as_dict() for a in actives],
+                })
+            self.recorder.event("new_level", self.level, self.lives)
+        if not boards:
+            targets, actives = lp_generate_level(
+                self.level, self.rng, self.width, self.height, pairs=self.level_pairs(),
             )
+        self._load_shapes(actives, targets)
 
-        self.redraw_shapes()
+        self._rebuild_index()
+        self.redraw()
         self.stats.start_level(self.level)
 
-    def _draw_background(self):
-        w = max(self.canvas.winfo_width(), self.width)
-        h = max(self.canvas.winfo_height(), self.height)
-        self.canvas.create_rectangle(0, 0, w, h, fill="#0f1115", outline="")
+    def _board_size(self):
+        if self.board_pairs is not None:
+            return self.width, self.height
+        w, h = self.renderer.size()
+        return max(w, self.width), max(h, self.height)
 
-    def _draw_center_circle(self):
-        cx, cy, r = 80, 80, 28
-        self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, outline="#e3b341", width=3)
-        self.canvas.create_text(cx, cy, text=f"{self.level-1}/{self.level_count}", fill="#e3b341", font=("Segoe UI", 10, "bold"))
+    def _load_shapes(self, actives, targets, active_ids=None, target_ids=None):
+        self.active_shapes.clear()
+        self.target_shapes.clear()
+        if active_ids and target_ids and len(active_ids) == len(actives) and len(target_ids) == len(targets):
+            # mentésből: az eredeti azonosítókkal, így a párok (és az eltérő "assign" párok) megmaradnak
+            for sid, a in zip(active_ids, actives):
+                self.active_shapes.add(a, int(sid))
+            for tid, t in zip(target_ids, targets):
+                self.target_shapes.add(t, int(tid))
+        else:
+            for a, t in zip(actives, targets):
+                sid = self.active_shapes.add(a)
+                self.target_shapes.add(t, sid)
+        self.selected_ids.clear()
+        self.focus_id = None
+        self._drag_id = None
+        self.undo_history.clear()
+
+    def _rebuild_index(self):
+        self._grid.clear()
+        for sh in self.active_shapes:
+            self._grid.insert(sh.id, sh.cx, sh.cy, sh.size)
+        self._target_grid.clear()
+        for t in self.target_shapes:
+            self._target_grid.insert(t.id, t.cx, t.cy, 0)
+
+    def _index_shape(self, sid):
+        sh = self.active_shapes[sid]
+        self._grid.update(sid, sh.cx, sh.cy, sh.size)
+
+    def _edit_ids(self):
+        if self.selected_ids:
+            return list(self.selected_ids)
+        if self.focus_id is not None:
+            return [self.focus_id]
+        return []
+
+    def shape_at(self, x, y):
+        # legfelső (legkésőbb létrehozott, így legfelül rajzolt) alakzat a kurzor alatt
+        for sid in sorted(self._grid.query_point(x, y), reverse=True):
+            if self.active_shapes[sid].contains(x, y):
+                return sid
+        return None
 
     def pointer_down(self, x, y):
-        self._drag_index = None
-        for i in reversed(range(len(self.active_shapes))):
-            if self.active_shapes[i].contains(x, y):
-                need = self.required_batch()
-                if i in self.selected_indices:
-                    self.selected_indices.remove(i)
-                elif len(self.selected_indices) < need:
-                    self.selected_indices.add(i)
-                self.focus_index = i
-                self._drag_index = i
-                self._drag_offset = (x - self.active_shapes[i].cx, y - self.active_shapes[i].cy)
-                break
+        if self.recorder:
+            self.recorder.event("pointer_down", x, y)
+        self.undo_history.commit(self.active_shapes)
+        self._drag_id = None
+        sid = self.shape_at(x, y)
+        if sid is not None:
+            need = self.required_batch()
+            if sid in self.selected_ids:
+                self.selected_ids.remove(sid)
+            elif len(self.selected_ids) < need:
+                self.selected_ids.add(sid)
+            self.focus_id = sid
+            self._drag_id = sid
+            sh = self.active_shapes[sid]
+            self._drag_offset = (x - sh.cx, y - sh.cy)
         self._update_selection_outline()
 
     def drag_to(self, x, y):
-        if self._drag_index is None:
+        if self.recorder:
+            self.recorder.event("drag_to", x, y)
+        if self._drag_id is None:
             return
-        idx = self._drag_index
-        sh = self.active_shapes[idx]
+        sid = self._drag_id
+        sh = self.active_shapes[sid]
+        self.undo_history.touch(sid, lp_shape_state(sh))
         new_cx = x - self._drag_offset[0]
         new_cy = y - self._drag_offset[1]
 
-        if 0 <= idx < len(self.target_shapes):
-            t = self.target_shapes[idx]
-            d = lp_distance((new_cx, new_cy), (t.cx, t.cy))
-            if d <= self.snap_radius:
-                sh.cx, sh.cy = t.cx, t.cy
-                self._drag_index = None
-            else:
-                sh.cx, sh.cy = new_cx, new_cy
+        tid = self._snap_target(sid, new_cx, new_cy)
+        if tid is not None:
+            t = self.target_shapes[tid]
+            sh.cx, sh.cy = t.cx, t.cy
+            self._drag_id = None
         else:
             sh.cx, sh.cy = new_cx, new_cy
 
-        self.redraw_shapes()
+        self._index_shape(sid)
+        self._update_shapes([sh])
         self._update_selection_outline()
 
+    def _snap_target(self, sid, x, y):
+        if self.match_mode != "assign":
+            if sid in self.target_shapes:
+                t = self.target_shapes[sid]
+                if lp_distance((x, y), (t.cx, t.cy)) <= self.snap_radius:
+                    return sid
+            return None
+        # a legközelebbi azonos oldalszámú cél, amelyen még nem ül másik alakzat
+        sides = self.active_shapes[sid].sides
+        best, best_d = None, self.snap_radius
+        for tid in self._target_grid.query_radius(x, y, self.snap_radius):
+            t = self.target_shapes[tid]
+            if t.sides != sides:
+                continue
+            d = lp_distance((x, y), (t.cx, t.cy))
+            if d <= best_d and not self._target_taken(tid, sid):
+                best, best_d = tid, d
+        return best
+
+    def _target_taken(self, tid, sid):
+        t = self.target_shapes[tid]
+        for other in self._grid.query_point(t.cx, t.cy):
+            if other != sid:
+                o = self.active_shapes[other]
+                if o.cx == t.cx and o.cy == t.cy:
+                    return True
+        return False
+
     def pointer_up(self, x, y):
-        self._drag_index = None
+        if self.recorder:
+            self.recorder.event("pointer_up", x, y)
+        self._drag_id = None
+        # a lenyomás és felengedés közötti összes drag_to egyetlen visszavonható lépés
+        self.undo_history.commit(self.active_shapes)
+
+    def _commit_edit(self):
+        # húzás közbeni forgatás/méretezés a húzás lépésébe olvad
+        if self._drag_id is None:
+            self.undo_history.commit(self.active_shapes)
 
     def rotate_active(self, deg):
-        if self.selected_indices:
-            targets = list(self.selected_indices)
-        elif self.focus_index is not None:
-            targets = [self.focus_index]
-        else:
-            targets = []
-        for i in targets:
-            sh = self.active_shapes[i]
+        if self.recorder:
+            self.recorder.event("rotate_active", deg)
+        targets = [self.active_shapes[sid] for sid in self._edit_ids()]
+        for sh in targets:
+            self.undo_history.touch(sh.id, lp_shape_state(sh))
             sh.rotation = lp_deg_norm(sh.rotation + deg)
         if targets:
-            self.redraw_shapes()
+            self._commit_edit()
+            self._update_shapes(targets)
             self._update_selection_outline()
 
     def scale_active(self, factor):
-        if self.selected_indices:
-            targets = list(self.selected_indices)
-        elif self.focus_index is not None:
-            targets = [self.focus_index]
-        else:
-            targets = []
-        for i in targets:
-            sh = self.active_shapes[i]
+        if self.recorder:
+            self.recorder.event("scale_active", factor)
+        targets = [self.active_shapes[sid] for sid in self._edit_ids()]
+        for sh in targets:
+            self.undo_history.touch(sh.id, lp_shape_state(sh))
             new_size = int(sh.size * factor)
             sh.size = max(30, min(260, new_size))
+            self._index_shape(sh.id)
         if targets:
-            self.redraw_shapes()
+            self._commit_edit()
+            self._update_shapes(targets)
             self._update_selection_outline()
 
     def redraw(self):
-        if not self.canvas:
-            return
-        self.canvas.delete("all")
-        self._draw_background()
-        self._draw_center_circle()
+        # a háttér és a HUD megmarad, csak az alakzatok rajzolódnak újra (új pálya, betöltés)
+        self.renderer.draw_background(*self._board_size())
+        self.renderer.draw_hud(self.level - 1, self.level_count)
         self.redraw_shapes()
         self._update_selection_outline()
 
     def redraw_shapes(self):
-        self.canvas.delete("ghost")
-        self.canvas.delete("active")
-        for t in self.target_shapes:
-            lp_draw_ghost_shape(self.canvas, t)
-        for a in self.active_shapes:
-            lp_draw_shape(self.canvas, a)
+        self.renderer.clear_shapes()
+        for t in self.target_shapes.ordered():
+            self.renderer.draw_ghost(t)
+        for a in self.active_shapes.ordered():
+            self.renderer.draw_shape(a)
+
+    def _update_shapes(self, shapes):
+        for sh in shapes:
+            self.renderer.update_shape(sh)
 
     def _update_selection_outline(self):
-        self.canvas.delete("selmark")
-        if self.selected_indices:
-            indices = list(self.selected_indices)
-        elif self.focus_index is not None:
-            indices = [self.focus_index]
-        else:
-            indices = []
-        for i in indices:
-            sh = self.active_shapes[i]
-            r = max(12, int(sh.size * 0.18))
-            self.canvas.create_oval(sh.cx - r, sh.cy - r, sh.cx + r, sh.cy + r,
-                                    outline="#ffd866", width=2, dash=(3, 3), tags=("selmark",))
+        self.renderer.draw_selection([self.active_shapes[sid] for sid in self._edit_ids()])
 
     def check_alignment_batch(self):
+        if self.recorder:
+            self.recorder.event("check_alignment_batch")
         if len(self.active_shapes) == 0:
             return None, "Ez a szint már kész."
 
         need = min(self.required_batch(), len(self.active_shapes))
 
-        if not self.selected_indices:
+        if not self.selected_ids:
             if len(self.active_shapes) <= need:
-                self.selected_indices = set(range(len(self.active_shapes)))
+                self.selected_ids = set(self.active_shapes.ids)
 
-        if len(self.selected_indices) != need:
+        if len(self.selected_ids) != need:
             return None, f"Jelölj ki egyszerre {need} darabot!"
 
-        if self.difficulty == "easy":
-            base_pos_thr = 120.0
-            base_rot_thr = 45.0
-            base_scale_thr = 0.50
-        elif self.difficulty == "hard":
-            base_pos_thr = 40.0
-            base_rot_thr = 18.0
-            base_scale_thr = 0.22
+        if self.match_mode == "assign":
+            pairs = self.assign_targets(self.selected_ids)
+        elif all(sid in self.target_shapes for sid in self.selected_ids):
+            pairs = {sid: sid for sid in self.selected_ids} if self._pairs_ok(self.selected_ids) else None
         else:
-            base_pos_thr = 70.0
-            base_rot_thr = 28.0
-            base_scale_thr = 0.35
-
-        for i in list(self.selected_indices):
-            a = self.active_shapes[i]
-            t = self.target_shapes[i]
-
-            d = lp_distance((a.cx, a.cy), (t.cx, t.cy))
-            rot_diff = abs(lp_deg_norm(a.rotation - t.rotation))
-            rot_diff = min(rot_diff, 360 - rot_diff)
-            scale_diff = abs(a.size - t.size) / t.size
-
-            if d < 1.0:
-                d = 0.0
-
-            ok = (d <= base_pos_thr) and (rot_diff <= base_rot_thr) and (scale_diff <= base_scale_thr)
-
-            if not ok:
-                self.lives -= 1
-                return False, "Pontatlan"
-
-        for i in sorted(self.selected_indices, reverse=True):
-            del self.active_shapes[i]
-            del self.target_shapes[i]
-        self.selected_indices.clear()
-        self.focus_index = None
-        self.redraw()
+            # egy korábbi "assign" illesztés elvihette az azonos azonosítójú célt: ez a pár nem illeszthető
+            pairs = None
+        if pairs is None:
+            self.lives -= 1
+            self.stats.lose_life(self.level)
+            return False, "Pontatlan"
+
+        self.undo_history.commit(self.active_shapes)
+        self.undo_history.push_match([
+            (sid, tid, lp_shape_record(self.active_shapes[sid]), lp_shape_record(self.target_shapes[tid]))
+            for sid, tid in sorted(pairs.items())
+        ])
+        # csak a párosított elemek tűnnek el, a jelenet többi része érintetlen
+        for sid, tid in pairs.items():
+            self.renderer.remove_shape(self.active_shapes[sid])
+            self.renderer.remove_shape(self.target_shapes[tid])
+            self.active_shapes.remove(sid)
+            self.target_shapes.remove(tid)
+            self._grid.remove(sid)
+            self._target_grid.remove(tid)
+        self.selected_ids.clear()
+        self.focus_id = None
+        self._update_selection_outline()
 
         if self.is_level_cleared():
+            # a teljesített szint lezárt, nem vonható vissza
+            self.undo_history.clear()
             self.stats.finish_level(self.level)
 
         return True, "Találat"
 
+    def undo(self):
+        if self.recorder:
+            self.recorder.event("undo")
+        self.undo_history.commit(self.active_shapes)
+        self._drag_id = None
+        step = self.undo_history.pop_undo()
+        if step is None:
+            return False
+        kind, data = step
+        if kind == "match":
+            # a párok ugyanazzal az azonosítóval kerülnek vissza, így a rajzolási sorrend is a régi
+            for sid, tid, a, t in data:
+                self.active_shapes.add(lp_record_shape(a), sid)
+                self.target_shapes.add(lp_record_shape(t), tid)
+                self._grid.insert(sid, a[0], a[1], a[2])
+                self._target_grid.insert(tid, t[0], t[1], 0)
+            self.redraw_shapes()
+        else:
+            self._apply_moves({sid: before for sid, (before, _after) in data.items()})
+        self._update_selection_outline()
+        return True
+
+    def redo(self):
+        if self.recorder:
+            self.recorder.event("redo")
+        self.undo_history.commit(self.active_shapes)
+        self._drag_id = None
+        step = self.undo_history.pop_redo()
+        if step is None:
+            return False
+        kind, data = step
+        if kind == "match":
+            for sid, tid, _a, _t in data:
+                self.renderer.remove_shape(self.active_shapes[sid])
+                self.renderer.remove_shape(self.target_shapes[tid])
+                self.active_shapes.remove(sid)
+                self.target_shapes.remove(tid)
+                self._grid.remove(sid)
+                self._target_grid.remove(tid)
+                self.selected_ids.discard(sid)
+                if self.focus_id == sid:
+                    self.focus_id = None
+        else:
+            self._apply_moves({sid: after for sid, (_before, after) in data.items()})
+        self._update_selection_outline()
+        return True
+
+    def _apply_moves(self, states):
+        shapes = []
+        for sid, state in states.items():
+            sh = self.active_shapes[sid]
+            lp_set_shape_state(sh, state)
+            self._index_shape(sid)
+            shapes.append(sh)
+        self._update_shapes(shapes)
+
+    def assign_targets(self, ids):
+        # {aktív id: cél id} a legkisebb összhibájú párosítással, vagy None, ha nem mindegyik fér a küszöbökbe
+        from lp_scoring import lp_match_selection, lp_shape_arrays, lp_thresholds
+        thr = lp_thresholds(self.difficulty, self.thresholds)
+        ids = sorted(ids)
+        actives = [self.active_shapes[sid] for sid in ids]
+        # a pozíciós tűrésen kívüli cél sosem felelhet meg, így elég a rács szerinti közeli célokat nézni
+        cand = set()
+        for sh in actives:
+            cand.update(self._target_grid.query_radius(sh.cx, sh.cy, thr[0]))
+        tids = sorted(cand)
+        targets = [self.target_shapes[tid] for tid in tids]
+        cols, ok = lp_match_selection(
+            lp_shape_arrays(actives), lp_shape_arrays(targets), thr,
+            [sh.sides for sh in actives], [t.sides for t in targets],
+        )
+        if not ok:
+            return None
+        return {sid: tids[c] for sid, c in zip(ids, cols)}
+
+    def _pairs_ok(self, ids) -> bool:
+        if len(ids) > LP_SCALAR_PAIRS:
+            return bool(self.score_pairs(ids)[1].all())
+        pos, rot, scale = self.thresholds or LP_THRESHOLDS.get(self.difficulty, LP_THRESHOLDS["normal"])
+        for sid in ids:
+            d, r, s = lp_pair_errors(self.active_shapes[sid], self.target_shapes[sid])
+            if d > pos or r > rot or s > scale:
+                return False
+        return True
+
+    def score_pairs(self, ids=None):
+        # pozíció/forgatás/méret hibák és a megfelelt maszk, egy NumPy lépésben (kötegelt, kijelző nélküli pontozás)
+        from lp_scoring import lp_score_pairs, lp_shape_arrays, lp_thresholds
+        if ids is None:
+            # csak az azonos azonosítójú céllal rendelkező alakzatok pontozhatók
+            ids = [sid for sid in self.active_shapes.ids if sid in self.target_shapes]
+        ids = sorted(ids)
+        active = lp_shape_arrays([self.active_shapes[sid] for sid in ids])
+        target = lp_shape_arrays([self.target_shapes[sid] for sid in ids])
+        return lp_score_pairs(active, target, lp_thresholds(self.difficulty, self.thresholds))
+
     def to_dict(self):
         return {
             "level": self.level,
             "lives": self.lives,
             "player_name": self.player_name,
-            "active": [s.__dict__ for s in self.active_shapes],
-            "target": [s.__dict__ for s in self.target_shapes],
+            "active": [s.as_dict() for s in self.active_shapes.ordered()],
+            "target": [s.as_dict() for s in self.target_shapes.ordered()],
+            # az "assign" illesztés után az aktív és cél azonosítók eltérhetnek: a párosítás így marad meg
+            "active_ids": sorted(self.active_shapes.ids),
+            "target_ids": sorted(self.target_shapes.ids),
             "stats": self.stats.as_dict(),
             "width": self.width,
             "height": self.height,
             "level_count": self.level_count,
             "difficulty": self.difficulty,
+            "seed": self.seed,
+            "match_mode": self.match_mode,
+            "board_pairs": self.board_pairs,
         }
 
-    def from_dict(self, data: dict):
+    def from_dict(self, data):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = lp_decode_save(data)
+        if self.recorder:
+            self.recorder.event("from_dict", data)
         self.level = int(data.get("level", 1))
         self.lives = int(data.get("lives", 3))
         self.player_name = data.get("player_name", self.player_name)
         self.width = int(data.get("width", self.width))
         self.height = int(data.get("height", self.height))
+        self.board_pairs = int(data["board_pairs"]) if data.get("board_pairs") else None
         self.level_count = int(data.get("level_count", self.level_count))
         self.difficulty = data.get("difficulty", self.difficulty)
         self.set_difficulty(self.difficulty)
-        self.active_shapes = [LPShape.from_dict(d) for d in data.get("active", []) if d]
-        self.target_shapes = [LPShape.from_dict(d) for d in data.get("target", []) if d]
-        self.selected_indices.clear()
-        self.focus_index = None
+        self.seed = int(data.get("seed", self.seed))
+        self.set_match_mode(data.get("match_mode", self.match_mode))
+        self._load_shapes(
+            [LPShape.from_dict(d) for d in data.get("active", []) if d],
+            [LPShape.from_dict(d) for d in data.get("target", []) if d],
+            data.get("active_ids"), data.get("target_ids"),
+        )
+        self._rebuild_index()
         self.redraw()
@@ -0,0 +1,154 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import sqlite3
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          INTEGER PRIMARY KEY,
+    player      TEXT    NOT NULL,
+    difficulty  TEXT    NOT NULL,
+    seed        INTEGER,
+    started     REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS levels (
+    id          INTEGER PRIMARY KEY,
+    session_id  INTEGER NOT NULL REFERENCES sessions(id),
+    player      TEXT    NOT NULL,
+    difficulty  TEXT    NOT NULL,
+    level       INTEGER NOT NULL,
+    seconds     REAL    NOT NULL,
+    attempts    INTEGER NOT NULL,
+    lives_lost  INTEGER NOT NULL,
+    finished    REAL    NOT NULL,
+    uid         TEXT
+);
+-- játékosonkénti legjobb idő: a ranglista és a percentilis ebből indexelten olvasható
+CREATE TABLE IF NOT EXISTS best (
+    player      TEXT    NOT NULL,
+    difficulty  TEXT    NOT NULL,
+    level       INTEGER NOT NULL,
+    seconds     REAL    NOT NULL,
+    PRIMARY KEY (player, difficulty, level)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_levels_board ON levels (difficulty, level, seconds);
+CREATE INDEX IF NOT EXISTS idx_levels_player ON levels (player, difficulty, level);
+CREATE INDEX IF NOT EXISTS idx_best_board ON best (difficulty, level, seconds);
+"""
+
+# a kliens által adott egyedi azonosító: az újraküldött rekord nem kerül be kétszer
+_UID_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_levels_uid ON levels (uid)"
+
+_INSERT_LEVEL = """
+INSERT OR IGNORE INTO levels (session_id, player, difficulty, level, seconds, attempts, lives_lost, finished, uid)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_UPSERT_BEST = """
+INSERT INTO best (player, difficulty, level, seconds) VALUES (?, ?, ?, ?)
+ON CONFLICT (player, difficulty, level) DO UPDATE SET seconds = excluded.seconds
+WHERE excluded.seconds < best.seconds
+"""
+
+
+class LPHistoryStore:
+    # helyi SQLite történet minden lejátszott szintről, kötegelt írással
+    def __init__(self, path: str = ":memory:", batch_size: int = 256):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.pending = []
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        # 32 MB lapgyorsítótár: a négy index kötegelt frissítése így ritkábban megy lemezre
+        self.db.execute("PRAGMA cache_size=-32768")
+        self.db.executescript(_SCHEMA)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(levels)")]
+        if "uid" not in columns:
+            self.db.execute("ALTER TABLE levels ADD COLUMN uid TEXT")
+        self.db.execute(_UID_INDEX)
+        self.db.commit()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def start_session(self, player: str, difficulty: str, seed: int | None = None) -> int:
+        cur = self.db.execute(
+            "INSERT INTO sessions (player, difficulty, seed, started) VALUES (?, ?, ?, ?)",
+            (player, difficulty, seed, time.time()),
+        )
+        self.db.commit()
+        return cur.lastrowid
+
+    def record_level(self, session_id: int, player: str, difficulty: str, level: int,
+                     seconds: float, attempts: int, lives_lost: int, finished: float | None = None,
+                     uid: str | None = None):
+        self.pending.append((session_id, player, difficulty, int(level), float(seconds),
+                             int(attempts), int(lives_lost), finished or time.time(), uid))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def record_many(self, rows):
+        # rows: (session_id, player, difficulty, level, seconds, attempts, lives_lost[, finished[, uid]])
+        for row in rows:
+            self.record_level(*row)
+
+    def flush(self) -> int:
+        # a lekérdezések előtt is lefut, így a függő sorok mindig láthatók
+        if not self.pending:
+            return 0
+        rows, self.pending = self.pending, []
+        with self.db:
+            self.db.executemany(_INSERT_LEVEL, rows)
+            self.db.executemany(_UPSERT_BEST, [(r[1], r[2], r[3], r[4]) for r in rows])
+        return len(rows)
+
+    def leaderboard(self, difficulty: str, level: int, limit: int = 10):
+        # [(játékos, legjobb idő)], a leggyorsabbtól
+        self.flush()
+        return self.db.execute(
+            "SELECT player, seconds FROM best WHERE difficulty = ? AND level = ? ORDER BY seconds LIMIT ?",
+            (difficulty, level, limit),
+        ).fetchall()
+
+    def player_best(self, player: str, difficulty: str, level: int) -> float | None:
+        self.flush()
+        row = self.db.execute(
+            "SELECT seconds FROM best WHERE player = ? AND difficulty = ? AND level = ?",
+            (player, difficulty, level),
+        ).fetchone()
+        return row[0] if row else None
+
+    def player_best_times(self, player: str, difficulty: str, levels):
+        self.flush()
+        rows = dict(self.db.execute(
+            "SELECT level, seconds FROM best WHERE player = ? AND difficulty = ?",
+            (player, difficulty),
+        ).fetchall())
+        return [rows.get(lv) for lv in levels]
+
+    def player_percentile(self, player: str, difficulty: str, level: int) -> float | None:
+        # a játékosok hány százalékánál jobb (vagy egyenlő) a játékos legjobb ideje
+        best = self.player_best(player, difficulty, level)
+        if best is None:
+            return None
+        slower, total = self.db.execute(
+            "SELECT SUM(seconds >= ?), COUNT(*) FROM best WHERE difficulty = ? AND level = ?",
+            (best, difficulty, level),
+        ).fetchone()
+        return 100.0 * (slower or 0) / total if total else None
+
+    def player_summary(self, player: str, difficulty: str | None = None):
+        sql = ("SELECT level, COUNT(*), AVG(seconds), MIN(seconds), SUM(attempts), SUM(lives_lost) "
+               "FROM levels WHERE player = ?")
+        args = [player]
+        if difficulty is not None:
+            sql += " AND difficulty = ?"
+            args.append(difficulty)
+        sql += " GROUP BY level ORDER BY level"
+        self.flush()
+        return [
+            {"level": lv, "plays": n, "avg_seconds": avg, "best_seconds": best,
+             "attempts": att, "lives_lost": lost}
+            for lv, n, avg, best, att, lost in self.db.execute(sql, args)
+        ]
@@ -0,0 +1,122 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import math
+
+from lp_shapes import LPShape
+
+LP_MAX_PAIRS = 5  # normál pályán szintenként legfeljebb ennyi pár, és egyszerre ennyi illeszthető
+
+
+def lp_level_pairs(level: int) -> int:
+    # normál pálya párszáma: az élő játék és a pályacsomagok is ezt használják
+    return min(level, LP_MAX_PAIRS)
+
+
+def lp_level_seed(seed: int, level: int) -> int:
+    # szintenkénti mag: ugyanaz a (seed, szint) minden gépen ugyanazt a pályát adja
+    return (seed * 1000003 + level) & 0xFFFFFFFFFFFF
+
+
+def lp_poisson_disk(x0, y0, x1, y1, min_dist, rng, k: int = 30):
+    # Bridson-féle mintavétel: bármely két pont legalább min_dist távolságra van
+    cell = min_dist / math.sqrt(2)
+    cols = int((x1 - x0) / cell) + 1
+    rows = int((y1 - y0) / cell) + 1
+    grid = [None] * (cols * rows)
+    min_d2 = min_dist * min_dist
+
+    def fits(px, py):
+        gi, gj = int((px - x0) / cell), int((py - y0) / cell)
+        for i in range(max(gi - 2, 0), min(gi + 3, cols)):
+            for j in range(max(gj - 2, 0), min(gj + 3, rows)):
+                q = grid[j * cols + i]
+                if q is not None and (q[0] - px) ** 2 + (q[1] - py) ** 2 < min_d2:
+                    return False
+        return True
+
+    def add(px, py):
+        grid[int((py - y0) / cell) * cols + int((px - x0) / cell)] = (px, py)
+        points.append((px, py))
+        active.append((px, py))
+
+    points = []
+    active = []
+    add(rng.uniform(x0, x1), rng.uniform(y0, y1))
+    while active:
+        idx = rng.randrange(len(active))
+        ax, ay = active[idx]
+        for _ in range(k):
+            ang = rng.uniform(0, 2 * math.pi)
+            dist = rng.uniform(min_dist, 2 * min_dist)
+            px, py = ax + dist * math.cos(ang), ay + dist * math.sin(ang)
+            if x0 <= px <= x1 and y0 <= py <= y1 and fits(px, py):
+                add(px, py)
+                break
+        else:
+            active[idx] = active[-1]
+            active.pop()
+    return points
+
+
+def lp_dart_sample(x0, y0, x1, y1, min_dist, count, rng, max_misses: int = 200):
+    # véletlen pontok rácsos ütközésvizsgálattal, amíg count darab össze nem jön: a költség a párok
+    # számával nő, nem a pálya területével; túl sűrű kérésnél (sok egymás utáni ütközés) None
+    cell = min_dist / math.sqrt(2)
+    cols = int((x1 - x0) / cell) + 1
+    rows = int((y1 - y0) / cell) + 1
+    grid = {}
+    min_d2 = min_dist * min_dist
+    points = []
+    misses = 0
+    while len(points) < count:
+        px, py = rng.uniform(x0, x1), rng.uniform(y0, y1)
+        gi, gj = int((px - x0) / cell), int((py - y0) / cell)
+        ok = True
+        for i in range(max(gi - 2, 0), min(gi + 3, cols)):
+            for j in range(max(gj - 2, 0), min(gj + 3, rows)):
+                q = grid.get((i, j))
+                if q is not None and (q[0] - px) ** 2 + (q[1] - py) ** 2 < min_d2:
+                    ok = False
+                    break
+            if not ok:
+                break
+        if ok:
+            grid[(gi, gj)] = (px, py)
+            points.append((px, py))
+            misses = 0
+        else:
+            misses += 1
+            if misses > max_misses:
+                return None
+    return points
+
+
+def lp_generate_level(level: int, rng, width: int, height: int, pairs: int, min_dist: float = 140):
+    sides = min(3 + (level - 1), 7)
+    # +1.5 px ráhagyás, hogy egészre kerekítve is megmaradjon a min_dist
+    centers = lp_dart_sample(220, 160, width - 220, height - 160, min_dist + 1.5, pairs, rng)
+    if centers is None:
+        # majdnem telített pálya: a teljes Poisson-kitöltésből választunk
+        candidates = lp_poisson_disk(220, 160, width - 220, height - 160, min_dist + 1.5, rng)
+        if len(candidates) < pairs:
+            raise ValueError(f"{pairs} pár nem fér el {width}x{height} méretű pályán")
+        centers = rng.sample(candidates, pairs)
+
+    targets = []
+    actives = []
+    for x, y in centers:
+        cx, cy = int(round(x)), int(round(y))
+        target_size = rng.randint(100, 150)
+        trot = rng.randint(0, 359)
+        targets.append(LPShape(cx=cx, cy=cy, size=target_size, rotation=trot, sides=sides, color="#3fb950"))
+        actives.append(
+            LPShape(
+                cx=cx + rng.randint(-180, 180),
+                cy=cy + rng.randint(-140, 140),
+                size=int(target_size * rng.uniform(0.75, 1.25)),
+                rotation=(trot + rng.randint(-70, 70)) % 360,
+                sides=sides,
+                color="#6cb6ff"
+            )
+        )
+    return targets, actives
@@ -0,0 +1,384 @@
+# CREATED BY Laczi Péter - R9SAAO
+"""
+Előre generált, nehézség szerint válogatott pályacsomagok.
+
+    python lp_levelpack.py --difficulty normal --candidates 20000 --per-level 50 --out normal.lppack.json
+    python lp_levelpack.py --difficulty hard --out hard.lppack              # bináris, memóriába leképezett csomag
+    python lp_levelpack.py --scaling --candidates 4000               # áteresztőképesség 1..N folyamattal
+
+A jelöltek generálása és pontozása folyamatkészleten fut; a munkások csak (pontszám, mag) párokat adnak vissza,
+a kiválasztott pályákat a főfolyamat a magból újragenerálja.
+
+Bináris csomag (.lppack): fejléc | meta JSON | színtábla | szinttábla | index | pályarekordok
+Az index fix szélességű, így bármely pálya O(1) idő alatt, a fájl többi részének beolvasása nélkül érhető el.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+from lp_layout import lp_generate_level, lp_level_pairs
+from lp_shapes import LPShape
+from lp_utils import lp_save_json
+
+LP_PACK_FORMAT = "lp-levelpack"
+LP_PACK_VERSION = 1
+LP_PACK_MAGIC = b"LPPK"
+
+# magic, verzió, meta hossz, színtábla hossz, szintek száma, pályák száma
+_PHEADER = struct.Struct("<4sHIIIQ")
+# szint, első pálya indexe, pályák száma
+_PLEVEL = struct.Struct("<IQI")
+# rekord eltolása a rekordterület elejétől, szint, párok száma, pontszám
+_PINDEX = struct.Struct("<QIHf")
+# cx, cy, méret, forgatás, oldalszám, szín index
+_PSHAPE = struct.Struct("<iiidBB")
+
+# a pontszám szerint rendezett jelöltek mely szeletéből válogatunk nehézségenként
+LP_PACK_BANDS = {
+    "easy": (0.0, 0.35),
+    "normal": (0.30, 0.70),
+    "hard": (0.65, 1.0),
+}
+
+
+def lp_level_difficulty(targets, actives, difficulty: str = "normal") -> float:
+    # mennyi "tűréshatárnyi" igazítás kell a pálya megoldásához: a kezdeti hibák
+    # (pozíció, forgatás, méret) a check_alignment_batch küszöbeihez mérve, az oldalszámmal súlyozva
+    from lp_scoring import lp_score_pairs, lp_shape_arrays, lp_thresholds
+    errors, _ok = lp_score_pairs(lp_shape_arrays(actives), lp_shape_arrays(targets), lp_thresholds(difficulty))
+    effort = (errors / lp_thresholds(difficulty)).sum()
+    # több oldal: nehezebb szemre eltalálni a forgatást
+    sides = targets[0].sides if targets else 3
+    return float(effort * (1.0 + 0.15 * (sides - 3)))
+
+
+def lp_level_seed_base(base_seed: int, level: int) -> int:
+    # szintenként külön magtartomány, hogy a jelöltek ne ismétlődjenek
+    return (base_seed * 1000003 + level) * 1_000_000_000
+
+
+def _score_range(job):
+    # munkás: [seed0, seed0 + count) magokból generál és pontoz
+    level, seed0, count, width, height, difficulty = job
+    pairs = lp_level_pairs(level)
+    out = []
+    for seed in range(seed0, seed0 + count):
+        targets, actives = lp_generate_level(level, random.Random(seed), width, height, pairs)
+        out.append((lp_level_difficulty(targets, actives, difficulty), seed))
+    return out
+
+
+def lp_score_candidates(levels, count: int, width: int = 1600, height: int = 900,
+                        difficulty: str = "normal", base_seed: int = 0, workers: int | None = None,
+                        chunk: int = 256) -> dict:
+    # {szint: [(pontszám, mag)]}, szintenként count jelölt; minden szint egy közös készleten fut
+    jobs = []
+    for level in levels:
+        seed0 = lp_level_seed_base(base_seed, level)
+        jobs += [(level, seed0 + i, min(chunk, count - i), width, height, difficulty) for i in range(0, count, chunk)]
+    scored = {level: [] for level in levels}
+    if workers == 1:
+        parts = map(_score_range, jobs)
+        for job, part in zip(jobs, parts):
+            scored[job[0]] += part
+        return scored
+    # a folyamatkészlet csak generáláskor kell, csomag betöltésekor nem
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for job, part in zip(jobs, pool.map(_score_range, jobs)):
+            scored[job[0]] += part
+    return scored
+
+
+def lp_curate(scored, per_level: int, difficulty: str = "normal"):
+    # a nehézségi sávból egyenletes közönként választ, így a csomagban a sáv teljes szélessége szerepel
+    ranked = sorted(scored)
+    lo, hi = LP_PACK_BANDS.get(difficulty, LP_PACK_BANDS["normal"])
+    band = ranked[int(lo * len(ranked)):max(int(hi * len(ranked)), int(lo * len(ranked)) + 1)]
+    if len(band) <= per_level:
+        return band
+    step = len(band) / per_level
+    return [band[int(i * step)] for i in range(per_level)]
+
+
+def lp_build_pack(levels: int = 5, candidates: int = 2000, per_level: int = 20, difficulty: str = "normal",
+                  width: int = 1600, height: int = 900, base_seed: int = 0, workers: int | None = None) -> dict:
+    pack = {
+        "format": LP_PACK_FORMAT,
+        "version": LP_PACK_VERSION,
+        "difficulty": difficulty,
+        "width": width,
+        "height": height,
+        "levels": [],
+    }
+    scored = lp_score_candidates(range(1, levels + 1), candidates, width, height, difficulty, base_seed, workers)
+    for level in range(1, levels + 1):
+        for score, seed in lp_curate(scored[level], per_level, difficulty):
+            targets, actives = lp_generate_level(level, random.Random(seed), width, height, lp_level_pairs(level))
+            pack["levels"].append({
+                "level": level,
+                "seed": seed,
+                "score": round(score, 3),
+                "active": [s.as_dict() for s in actives],
+                "target": [s.as_dict() for s in targets],
+            })
+    return pack
+
+
+class LPLevelPack:
+    # JSON csomag a memóriában; ugyanaz a felület, mint az LPLevelPackFile-é
+    def __init__(self, pack: dict):
+        self.width = int(pack.get("width", 0))
+        self.height = int(pack.get("height", 0))
+        self.difficulty = pack.get("difficulty")
+        self._levels = {}
+        for entry in pack["levels"]:
+            self._levels.setdefault(int(entry["level"]), []).append(entry)
+
+    def __len__(self):
+        return sum(len(v) for v in self._levels.values())
+
+    def count(self, level: int) -> int:
+        return len(self._levels.get(level, ()))
+
+    def board(self, level: int, k: int):
+        entry = self._levels[level][k]
+        return ([LPShape.from_dict(d) for d in entry["target"]],
+                [LPShape.from_dict(d) for d in entry["active"]])
+
+    def close(self):
+        pass
+
+
+class LPLevelPackWriter:
+    # folyamatosan írja a rekordokat, az indexet és a fejlécet a végén teszi eléjük; több millió pálya is mehet
+    def __init__(self, path: str, width: int, height: int, difficulty: str = "normal"):
+        self.path = path
+        self.meta = {"width": width, "height": height, "difficulty": difficulty}
+        self.colors = {}
+        self.index = []
+        self._records = tempfile.TemporaryFile()
+        self._pos = 0
+
+    def add(self, level: int, targets, actives, score: float = 0.0):
+        shapes = list(targets) + list(actives)
+        # az új színek csak akkor kerülnek a táblába, ha az egész pálya belefér (a darabszám egy bájt)
+        new = [c for c in dict.fromkeys(sh.color for sh in shapes) if c not in self.colors]
+        if len(self.colors) + len(new) > 255:
+            raise ValueError("legfeljebb 255 különböző szín írható")
+        for c in new:
+            self.colors[c] = len(self.colors)
+        out = bytearray()
+        for sh in shapes:
+            out += _PSHAPE.pack(int(sh.cx), int(sh.cy), int(sh.size), float(sh.rotation), int(sh.sides),
+                                self.colors[sh.color])
+        self.index.append((level, len(self.index), self._pos, len(targets), score))
+        self._records.write(out)
+        self._pos += len(out)
+
+    def close(self):
+        # szint szerint rendezett index (a rekordok sorrendje tetszőleges maradhat)
+        self.index.sort()
+        levels = []
+        for i, (level, *_rest) in enumerate(self.index):
+            if not levels or levels[-1][0] != level:
+                levels.append([level, i, 0])
+            levels[-1][2] += 1
+        meta_raw = json.dumps(self.meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        color_raw = bytearray([len(self.colors)])
+        for color in self.colors:
+            raw = color.encode("utf-8")
+            color_raw.append(len(raw))
+            color_raw += raw
+        head = bytearray(_PHEADER.pack(LP_PACK_MAGIC, LP_PACK_VERSION, len(meta_raw), len(color_raw),
+                                       len(levels), len(self.index)))
+        head += meta_raw + color_raw
+        for row in levels:
+            head += _PLEVEL.pack(*row)
+        for level, _order, pos, pairs, score in self.index:
+            head += _PINDEX.pack(pos, level, pairs, score)
+
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".lp_", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(head)
+                self._records.seek(0)
+                while True:
+                    chunk = self._records.read(1 << 20)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        finally:
+            self._records.close()
+
+
+class LPLevelPackFile:
+    # memóriába leképezett bináris csomag: csak a kért pálya rekordjait dekódolja
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except BaseException:
+            self._mm.close()
+            raise
+
+    def _parse(self):
+        mm = self._mm
+        if len(mm) < _PHEADER.size:
+            raise ValueError("nem LP pályacsomag")
+        magic, version, meta_len, color_len, n_levels, count = _PHEADER.unpack_from(mm, 0)
+        if magic != LP_PACK_MAGIC:
+            raise ValueError("nem LP pályacsomag")
+        if version > LP_PACK_VERSION:
+            raise ValueError(f"ismeretlen pályacsomag verzió: {version}")
+        pos = _PHEADER.size
+        meta = json.loads(mm[pos:pos + meta_len].decode("utf-8"))
+        pos += meta_len
+        self.width = int(meta.get("width", 0))
+        self.height = int(meta.get("height", 0))
+        self.difficulty = meta.get("difficulty")
+        self.colors = []
+        end = pos + color_len
+        pos += 1
+        while pos < end:
+            n = mm[pos]
+            self.colors.append(mm[pos + 1:pos + 1 + n].decode("utf-8"))
+            pos += 1 + n
+        # a szinttábla kicsi (szintenként egy sor), ezt az egyet beolvassuk
+        self._levels = {}
+        for level, first, n in _PLEVEL.iter_unpack(mm[pos:pos + n_levels * _PLEVEL.size]):
+            self._levels[level] = (first, n)
+        pos += n_levels * _PLEVEL.size
+        self._index_pos = pos
+        self._records_pos = pos + count * _PINDEX.size
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def levels(self):
+        return sorted(self._levels)
+
+    def count(self, level: int) -> int:
+        return self._levels.get(level, (0, 0))[1]
+
+    def entry(self, i: int):
+        # (szint, pontszám, célok, aktívak) az i. pályára, a teljes csomagon belül
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        pos, level, pairs, score = _PINDEX.unpack_from(self._mm, self._index_pos + i * _PINDEX.size)
+        start = self._records_pos + pos
+        shapes = [
+            LPShape(cx=cx, cy=cy, size=size, rotation=rot, sides=sides, color=self.colors[color])
+            for cx, cy, size, rot, sides, color
+            in _PSHAPE.iter_unpack(self._mm[start:start + 2 * pairs * _PSHAPE.size])
+        ]
+        return level, score, shapes[:pairs], shapes[pairs:]
+
+    def board(self, level: int, k: int):
+        first, n = self._levels[level]
+        if not 0 <= k < n:
+            raise IndexError(k)
+        _level, _score, targets, actives = self.entry(first + k)
+        return targets, actives
+
+    def close(self):
+        if not self._mm.closed:
+            self._mm.close()
+
+
+def lp_write_pack_binary(path: str, pack: dict):
+    writer = LPLevelPackWriter(path, pack.get("width", 1600), pack.get("height", 900), pack.get("difficulty", "normal"))
+    for entry in pack["levels"]:
+        writer.add(int(entry["level"]),
+                   [LPShape.from_dict(d) for d in entry["target"]],
+                   [LPShape.from_dict(d) for d in entry["active"]],
+                   float(entry.get("score", 0.0)))
+    writer.close()
+
+
+def lp_save_pack(path: str, pack: dict):
+    # .lppack kiterjesztés: bináris, egyébként JSON
+    if str(path).endswith(".lppack"):
+        lp_write_pack_binary(path, pack)
+    else:
+        lp_save_json(path, pack)
+
+
+def lp_load_pack(path: str):
+    # LPLevelPackFile (bináris, leképezve) vagy LPLevelPack (JSON)
+    with open(path, "rb") as f:
+        magic = f.read(len(LP_PACK_MAGIC))
+    if magic == LP_PACK_MAGIC:
+        return LPLevelPackFile(path)
+    with open(path, "r", encoding="utf-8") as f:
+        pack = json.load(f)
+    if pack.get("format") != LP_PACK_FORMAT:
+        raise ValueError("nem LP pályacsomag")
+    if int(pack.get("version", 0)) > LP_PACK_VERSION:
+        raise ValueError(f"ismeretlen pályacsomag verzió: {pack.get('version')}")
+    return LPLevelPack(pack)
+
+
+def lp_scaling(candidates: int, level: int = 5, max_workers: int | None = None):
+    # jelölt/s 1, 2, 4, ... folyamattal
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = sorted({1, max_workers} | {n for n in (2, 4, 8, 16, 32, 64) if n < max_workers})
+    rows = []
+    for n in counts:
+        t0 = time.perf_counter()
+        lp_score_candidates([level], candidates, workers=n)
+        dt = time.perf_counter() - t0
+        rows.append((n, candidates / dt))
+        print(f"{n:>3} folyamat  {candidates / dt:>10.1f} jelölt/s  ({rows[-1][1] / rows[0][1]:.2f}x)", flush=True)
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LP Shape Evolution – pályacsomag generálás")
+    ap.add_argument("--difficulty", default="normal", choices=sorted(LP_PACK_BANDS))
+    ap.add_argument("--levels", type=int, default=5)
+    ap.add_argument("--candidates", type=int, default=2000, help="jelöltek száma szintenként")
+    ap.add_argument("--per-level", type=int, default=20, help="a csomagba kerülő pályák szintenként")
+    ap.add_argument("--width", type=int, default=1600)
+    ap.add_argument("--height", type=int, default=900)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None, help="folyamatok száma (alapból a magok száma)")
+    ap.add_argument("--out", help="kimeneti fájl (.lppack: bináris, .lppack.json: JSON)")
+    ap.add_argument("--scaling", action="store_true", help="áteresztőképesség mérése 1..N folyamattal")
+    args = ap.parse_args(argv)
+
+    if args.scaling:
+        lp_scaling(args.candidates, max_workers=args.workers)
+        return 0
+    t0 = time.perf_counter()
+    pack = lp_build_pack(args.levels, args.candidates, args.per_level, args.difficulty,
+                         args.width, args.height, args.seed, args.workers)
+    dt = time.perf_counter() - t0
+    print(f"{args.levels * args.candidates} jelölt, {len(pack['levels'])} pálya kiválasztva, {dt:.1f} s")
+    if args.out:
+        lp_save_pack(args.out, pack)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
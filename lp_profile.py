@@ -0,0 +1,200 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import json
+import time
+from array import array
+
+LP_CANVAS_CREATE = ("create_polygon", "create_oval", "create_rectangle", "create_text",
+                    "create_line", "create_image")
+
+
+class LPRing:
+    # rögzített méretű körpuffer, a legrégebbi mintát írja felül
+    def __init__(self, capacity: int):
+        self.data = array("d", bytes(8 * capacity))
+        self.capacity = capacity
+        self.pos = 0
+        self.count = 0
+
+    def push(self, value: float):
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def values(self):
+        if self.count < self.capacity:
+            return list(self.data[:self.count])
+        return list(self.data[self.pos:]) + list(self.data[:self.pos])
+
+    def percentile(self, p: float) -> float:
+        vals = sorted(self.values())
+        if not vals:
+            return 0.0
+        return vals[min(len(vals) - 1, int(p * len(vals)))]
+
+
+class LPProfiler:
+    # kikapcsolt állapotban nincs mérőkód a hívási úton: a metódusokat csak bekapcsoláskor burkolja
+    def __init__(self, capacity: int = 2048):
+        self.capacity = capacity
+        self.timings = {}
+        self.calls = {}
+        self.frame_ms = LPRing(capacity)
+        self.frame_created = LPRing(capacity)
+        self.frame_deleted = LPRing(capacity)
+        self.created = 0
+        self._patched = []
+        self._canvas = None
+        self._item_count = 0
+        self._last_frame = None
+
+    @property
+    def enabled(self):
+        return bool(self._patched)
+
+    def record(self, name: str, seconds: float):
+        ring = self.timings.get(name)
+        if ring is None:
+            ring = self.timings[name] = LPRing(self.capacity)
+        ring.push(seconds * 1000.0)
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def instrument(self, obj, names, prefix: str = ""):
+        for name in names:
+            orig = getattr(obj, name)
+            label = prefix + name
+
+            def timed(*args, _orig=orig, _label=label, **kw):
+                t0 = time.perf_counter()
+                try:
+                    return _orig(*args, **kw)
+                finally:
+                    self.record(_label, time.perf_counter() - t0)
+
+            setattr(obj, name, timed)
+            self._patched.append((obj, name))
+
+    def instrument_canvas(self, canvas):
+        self._canvas = canvas
+        self._item_count = len(canvas.find_all())
+        for name in LP_CANVAS_CREATE:
+            orig = getattr(canvas, name, None)
+            if orig is None:
+                continue
+
+            def counted(*args, _orig=orig, **kw):
+                self.created += 1
+                return _orig(*args, **kw)
+
+            setattr(canvas, name, counted)
+            self._patched.append((canvas, name))
+
+    def uninstrument(self):
+        for obj, name in reversed(self._patched):
+            if name in vars(obj):
+                delattr(obj, name)
+        self._patched.clear()
+        self._canvas = None
+        self._last_frame = None
+
+    def frame(self):
+        # képkockánként hívandó: a két hívás közti idő a képkockaidő
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self.frame_ms.push((now - self._last_frame) * 1000.0)
+        self._last_frame = now
+        if self._canvas is not None:
+            count = len(self._canvas.find_all())
+            deleted = self.created - (count - self._item_count)
+            self.frame_created.push(self.created)
+            self.frame_deleted.push(max(0, deleted))
+            self._item_count = count
+            self.created = 0
+
+    def fps(self) -> float:
+        vals = self.frame_ms.values()[-60:]
+        if not vals:
+            return 0.0
+        return 1000.0 * len(vals) / sum(vals)
+
+    def summary(self) -> dict:
+        def stats(ring):
+            vals = ring.values()
+            return {
+                "n": len(vals),
+                "mean": sum(vals) / len(vals) if vals else 0.0,
+                "p50": ring.percentile(0.50),
+                "p95": ring.percentile(0.95),
+                "p99": ring.percentile(0.99),
+                "max": max(vals) if vals else 0.0,
+            }
+
+        return {
+            "fps": self.fps(),
+            "frame_ms": stats(self.frame_ms),
+            "items_created_per_frame": stats(self.frame_created),
+            "items_deleted_per_frame": stats(self.frame_deleted),
+            "calls": dict(self.calls),
+            "timings_ms": {name: stats(ring) for name, ring in sorted(self.timings.items())},
+        }
+
+    def dump(self, path: str, extra: dict | None = None):
+        data = self.summary()
+        if extra:
+            data.update(extra)
+        data["raw_frame_ms"] = self.frame_ms.values()
+        data["raw_timings_ms"] = {name: ring.values() for name, ring in self.timings.items()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+class LPProfileOverlay:
+    # FPS és p95 képkockaidő a canvas jobb felső sarkában
+    def __init__(self, root, canvas, profiler: LPProfiler, frame_ms: int = 16, refresh_ms: int = 250):
+        self.root = root
+        self.canvas = canvas
+        self.profiler = profiler
+        self.frame_interval = frame_ms
+        self.refresh_ms = refresh_ms
+        self.text_id = None
+        self._job = None
+        self._last_refresh = 0.0
+
+    @property
+    def visible(self):
+        return self._job is not None
+
+    def show(self):
+        if self._job is None:
+            self._job = self.root.after(self.frame_interval, self._tick)
+
+    def hide(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self.canvas.delete("profile")
+        self.text_id = None
+
+    def _tick(self):
+        self.profiler.frame()
+        now = time.perf_counter()
+        if (now - self._last_refresh) * 1000.0 >= self.refresh_ms:
+            self._last_refresh = now
+            self._refresh()
+        self._job = self.root.after(self.frame_interval, self._tick)
+
+    def _refresh(self):
+        p = self.profiler
+        text = (f"FPS {p.fps():5.1f}   p95 {p.frame_ms.percentile(0.95):5.1f} ms\n"
+                f"+{int(p.frame_created.percentile(0.95))} / -{int(p.frame_deleted.percentile(0.95))} elem/kocka (p95)")
+        # a teljes újrarajzolás törli a feliratot, ilyenkor újra létrehozzuk
+        if self.text_id is None or not self.canvas.type(self.text_id):
+            x = max(self.canvas.winfo_width(), 200) - 12
+            self.text_id = self.canvas.create_text(
+                x, 12, text=text, anchor="ne", fill="#ffd866",
+                font=("Consolas", 10, "bold"), tags=("profile",)
+            )
+        else:
+            self.canvas.itemconfig(self.text_id, text=text)
+        self.canvas.tag_raise("profile")
@@ -0,0 +1,414 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+from lp_shapes import lp_draw_shape, lp_draw_ghost_shape, lp_remove_shape, lp_update_shape
+from lp_spatial import LPSpatialGrid
+
+
+class LPRenderer:
+    # a játékmotor csak ezen a felületen keresztül rajzol
+
+    def size(self):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def draw_background(self, width, height):
+        raise NotImplementedError
+
+    def draw_hud(self, done, total):
+        raise NotImplementedError
+
+    def clear_shapes(self):
+        raise NotImplementedError
+
+    def draw_ghost(self, shape):
+        raise NotImplementedError
+
+    def draw_shape(self, shape):
+        raise NotImplementedError
+
+    def update_shape(self, shape):
+        raise NotImplementedError
+
+    def remove_shape(self, shape):
+        raise NotImplementedError
+
+    def draw_selection(self, shapes):
+        raise NotImplementedError
+
+
+class LPNullRenderer(LPRenderer):
+    # kijelző nélküli futáshoz: semmit nem rajzol
+
+    def size(self):
+        return 0, 0
+
+    def clear(self):
+        pass
+
+    def draw_background(self, width, height):
+        pass
+
+    def draw_hud(self, done, total):
+        pass
+
+    def clear_shapes(self):
+        pass
+
+    def draw_ghost(self, shape):
+        pass
+
+    def draw_shape(self, shape):
+        pass
+
+    def update_shape(self, shape):
+        pass
+
+    def remove_shape(self, shape):
+        pass
+
+    def draw_selection(self, shapes):
+        pass
+
+
+class LPRecordingRenderer(LPNullRenderer):
+    # minden rajzolási hívást eltárol (tesztekhez, méréshez)
+
+    def __init__(self):
+        self.calls = []
+
+    def clear(self):
+        self.calls.append(("clear",))
+
+    def draw_background(self, width, height):
+        self.calls.append(("draw_background", width, height))
+
+    def draw_hud(self, done, total):
+        self.calls.append(("draw_hud", done, total))
+
+    def clear_shapes(self):
+        self.calls.append(("clear_shapes",))
+
+    def draw_ghost(self, shape):
+        self.calls.append(("draw_ghost", shape.cx, shape.cy, shape.size, shape.rotation, shape.sides))
+
+    def draw_shape(self, shape):
+        self.calls.append(("draw_shape", shape.cx, shape.cy, shape.size, shape.rotation, shape.sides))
+
+    def update_shape(self, shape):
+        self.calls.append(("update_shape", shape.cx, shape.cy, shape.size, shape.rotation, shape.sides))
+
+    def remove_shape(self, shape):
+        self.calls.append(("remove_shape", shape.cx, shape.cy, shape.size, shape.rotation, shape.sides))
+
+    def draw_selection(self, shapes):
+        self.calls.append(("draw_selection", [(s.cx, s.cy) for s in shapes]))
+
+
+class LPTkRenderer(LPRenderer):
+    # a háttér, a HUD és a kijelölés jelölői egyszer jönnek létre, utána csak módosulnak
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._bg = None
+        self._hud = None
+        self._hud_text = None
+        self._marks = []
+
+    def size(self):
+        return self.canvas.winfo_width(), self.canvas.winfo_height()
+
+    def clear(self):
+        self.canvas.delete("all")
+        self._bg = None
+        self._hud = None
+        self._hud_text = None
+        self._marks = []
+
+    def draw_background(self, width, height):
+        if self._bg is None:
+            self._bg = self.canvas.create_rectangle(0, 0, width, height, fill="#0f1115", outline="", tags=("bg",))
+        else:
+            self.canvas.coords(self._bg, 0, 0, width, height)
+
+    def draw_hud(self, done, total):
+        text = f"{done}/{total}"
+        if self._hud is None:
+            cx, cy, r = 80, 80, 28
+            self._hud = self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r, outline="#e3b341", width=3,
+                                                tags=("hud",))
+            self._hud_text = self.canvas.create_text(cx, cy, text=text, fill="#e3b341",
+                                                     font=("Segoe UI", 10, "bold"), tags=("hud",))
+        else:
+            self.canvas.itemconfig(self._hud_text, text=text)
+
+    def clear_shapes(self):
+        self.canvas.delete("ghost")
+        self.canvas.delete("active")
+        # az új alakzatok fölé kerüljenek: a következő draw_selection újra létrehozza őket
+        self.canvas.delete("selmark")
+        self._marks = []
+
+    def draw_ghost(self, shape):
+        lp_draw_ghost_shape(self.canvas, shape)
+
+    def draw_shape(self, shape):
+        lp_draw_shape(self.canvas, shape)
+
+    def update_shape(self, shape):
+        lp_update_shape(self.canvas, shape)
+
+    def remove_shape(self, shape):
+        lp_remove_shape(self.canvas, shape)
+
+    def draw_selection(self, shapes):
+        # a jelölők újrahasznosulnak: húzás közben csak a koordinátájuk változik
+        for k, sh in enumerate(shapes):
+            r = max(12, int(sh.size * 0.18))
+            box = (sh.cx - r, sh.cy - r, sh.cx + r, sh.cy + r)
+            if k < len(self._marks):
+                self.canvas.coords(self._marks[k], *box)
+            else:
+                self._marks.append(self.canvas.create_oval(*box, outline="#ffd866", width=2, dash=(3, 3),
+                                                           tags=("selmark",)))
+        for item in self._marks[len(shapes):]:
+            self.canvas.delete(item)
+        del self._marks[len(shapes):]
+
+
+class LPViewport:
+    # világ <-> képernyő leképezés: képernyő = (világ - eltolás) * nagyítás
+    def __init__(self, world_w, world_h, screen_w=1, screen_h=1, min_zoom=0.05, max_zoom=4.0):
+        self.world_w = world_w
+        self.world_h = world_h
+        self.screen_w = max(1, screen_w)
+        self.screen_h = max(1, screen_h)
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = 1.0
+
+    def resize(self, screen_w, screen_h):
+        self.screen_w = max(1, screen_w)
+        self.screen_h = max(1, screen_h)
+        self._clamp()
+
+    def to_screen(self, x, y):
+        return (x - self.x) * self.zoom, (y - self.y) * self.zoom
+
+    def to_world(self, sx, sy):
+        return sx / self.zoom + self.x, sy / self.zoom + self.y
+
+    def visible_rect(self):
+        return self.x, self.y, self.x + self.screen_w / self.zoom, self.y + self.screen_h / self.zoom
+
+    def pan(self, dx, dy):
+        # dx, dy képernyőpixelben: a tartalom a kurzorral együtt mozdul
+        self.x -= dx / self.zoom
+        self.y -= dy / self.zoom
+        self._clamp()
+
+    def zoom_at(self, factor, sx, sy):
+        # a kurzor alatti világpont helyben marad
+        wx, wy = self.to_world(sx, sy)
+        self.zoom = max(self.min_zoom, min(self.max_zoom, self.zoom * factor))
+        self.x = wx - sx / self.zoom
+        self.y = wy - sy / self.zoom
+        self._clamp()
+
+    def center_on(self, x, y):
+        self.x = x - self.screen_w / self.zoom / 2
+        self.y = y - self.screen_h / self.zoom / 2
+        self._clamp()
+
+    def fit(self):
+        self.zoom = max(self.min_zoom, min(self.max_zoom, self.screen_w / self.world_w, self.screen_h / self.world_h))
+        self.x = (self.world_w - self.screen_w / self.zoom) / 2
+        self.y = (self.world_h - self.screen_h / self.zoom) / 2
+
+    def _clamp(self):
+        # legfeljebb fél képernyőnyit lehet a világ szélén túlgörgetni
+        vw, vh = self.screen_w / self.zoom, self.screen_h / self.zoom
+        self.x = max(-vw / 2, min(self.world_w - vw / 2, self.x))
+        self.y = max(-vh / 2, min(self.world_h - vh / 2, self.y))
+
+
+class LPViewportRenderer(LPTkRenderer):
+    # nagy pálya: görgethető, nagyítható nézet; Tk elem csak a látható alakzatokhoz létezik
+    def __init__(self, canvas, view: LPViewport, cell: float = 256.0):
+        super().__init__(canvas)
+        self.view = view
+        self._layer = {}  # (tábla, id) -> "ghost" / "active"
+        self._shapes = {}  # (tábla, id) -> alakzat
+        self._index = LPSpatialGrid(cell)
+        self._shown = set()
+        self._bg_size = (view.world_w, view.world_h)
+        self._selection = []
+        self._restack = False
+        self._zoom = view.zoom
+
+    @staticmethod
+    def _key(shape):
+        return id(shape.table), shape.id
+
+    def clear(self):
+        super().clear()
+        self._forget()
+
+    def clear_shapes(self):
+        super().clear_shapes()
+        self._forget()
+
+    def _forget(self):
+        self._layer.clear()
+        self._shapes.clear()
+        self._index.clear()
+        self._shown.clear()
+
+    def draw_background(self, width, height):
+        self._bg_size = (width, height)
+        x0, y0 = self.view.to_screen(0, 0)
+        x1, y1 = self.view.to_screen(width, height)
+        if self._bg is None:
+            self._bg = self.canvas.create_rectangle(x0, y0, x1, y1, fill="#0f1115", outline="#30363d",
+                                                    tags=("bg",))
+        else:
+            self.canvas.coords(self._bg, x0, y0, x1, y1)
+
+    def draw_ghost(self, shape):
+        self._register(shape, "ghost")
+
+    def draw_shape(self, shape):
+        self._register(shape, "active")
+
+    def _register(self, shape, layer):
+        key = self._key(shape)
+        self._layer[key] = layer
+        self._shapes[key] = shape
+        self._index.insert(key, shape.cx, shape.cy, shape.size)
+        if self._visible(shape):
+            self._show(key)
+
+    def update_shape(self, shape):
+        key = self._key(shape)
+        if key not in self._layer:
+            self._register(shape, "active")
+            return
+        self._shapes[key] = shape
+        self._index.update(key, shape.cx, shape.cy, shape.size)
+        if not self._visible(shape):
+            self._hide(key)
+        elif key in self._shown:
+            self._place(shape)
+        else:
+            self._show(key)
+
+    def remove_shape(self, shape):
+        key = self._key(shape)
+        self._hide(key)
+        self._layer.pop(key, None)
+        self._shapes.pop(key, None)
+        self._index.remove(key)
+
+    def draw_selection(self, shapes):
+        self._selection = list(shapes)
+        view = self.view
+        boxes = []
+        for sh in self._selection:
+            sx, sy = view.to_screen(sh.cx, sh.cy)
+            r = max(12, int(sh.size * 0.18 * view.zoom))
+            boxes.append((sx - r, sy - r, sx + r, sy + r))
+        for k, box in enumerate(boxes):
+            if k < len(self._marks):
+                self.canvas.coords(self._marks[k], *box)
+            else:
+                self._marks.append(self.canvas.create_oval(*box, outline="#ffd866", width=2, dash=(3, 3),
+                                                           tags=("selmark",)))
+        for item in self._marks[len(boxes):]:
+            self.canvas.delete(item)
+        del self._marks[len(boxes):]
+        self._raise_overlays()
+
+    def refresh(self):
+        # nézetváltás után: a kikerülők elemei törlődnek, a beérkezők most jönnek létre, a többi csak áthelyeződik
+        visible = {key for key in self._index.query_rect(*self.view.visible_rect())
+                   if self._visible(self._shapes[key])}
+        for key in self._shown - visible:
+            self._hide(key)
+        rezoom = self._zoom != self.view.zoom
+        self._zoom = self.view.zoom
+        for key in visible:
+            if key in self._shown:
+                self._place(self._shapes[key])
+                if rezoom:
+                    self.canvas.itemconfig(self._shapes[key].items[0], width=self._width(key))
+            else:
+                self._show(key)
+        self.draw_background(*self._bg_size)
+        self.draw_selection(self._selection)
+
+    @property
+    def shown_count(self):
+        return len(self._shown)
+
+    def _visible(self, shape):
+        x0, y0, x1, y1 = self.view.visible_rect()
+        r = shape.size
+        return shape.cx + r >= x0 and shape.cx - r <= x1 and shape.cy + r >= y0 and shape.cy - r <= y1
+
+    def _screen_points(self, shape):
+        view = self.view
+        z, ox, oy = view.zoom, view.x, view.y
+        pts = shape.polygon()
+        out = [0.0] * len(pts)
+        out[0::2] = [(v - ox) * z for v in pts[0::2]]
+        out[1::2] = [(v - oy) * z for v in pts[1::2]]
+        return out
+
+    def _show(self, key):
+        shape = self._shapes[key]
+        ghost = self._layer[key] == "ghost"
+        color = "#3fb950" if ghost else shape.color
+        sx, sy = self.view.to_screen(shape.cx, shape.cy)
+        if ghost:
+            poly = self.canvas.create_polygon(self._screen_points(shape), outline=color, width=self._width(key),
+                                              dash=(4, 4), fill="", tags=("ghost",))
+        else:
+            poly = self.canvas.create_polygon(self._screen_points(shape), outline=color, width=self._width(key),
+                                              fill="", tags=("active",))
+        dot = self.canvas.create_oval(sx - 2, sy - 2, sx + 2, sy + 2, fill=color, outline="",
+                                      tags=("ghost",) if ghost else ("active",))
+        if ghost and self._bg is not None:
+            # a célok a háttér fölé, de minden aktív alakzat alá kerülnek
+            self.canvas.tag_raise(dot, self._bg)
+            self.canvas.tag_raise(poly, self._bg)
+        shape.items = (poly, dot)
+        self._shown.add(key)
+        self._restack = True
+
+    def _width(self, key):
+        # a körvonal vastagsága a nagyítással arányos
+        return max(1, round((5 if self._layer[key] == "ghost" else 7) * self.view.zoom))
+
+    def _place(self, shape):
+        poly, dot = shape.items
+        sx, sy = self.view.to_screen(shape.cx, shape.cy)
+        self.canvas.coords(poly, self._screen_points(shape))
+        self.canvas.coords(dot, sx - 2, sy - 2, sx + 2, sy + 2)
+
+    def _hide(self, key):
+        if key not in self._shown:
+            return
+        self._shown.discard(key)
+        shape = self._shapes[key]
+        for item in shape.items or ():
+            self.canvas.delete(item)
+        shape.items = ()
+
+    def _raise_overlays(self):
+        # az újonnan létrehozott alakzatok fölé a kijelölés és a HUD
+        if self._restack:
+            self.canvas.tag_raise("selmark")
+            self.canvas.tag_raise("hud")
+            self._restack = False
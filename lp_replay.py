@@ -0,0 +1,259 @@
+# CREATED BY Laczi Péter - R9SAAO
+"""
+Játékmenet rögzítése és visszajátszása.
+
+    python lp_replay.py session.lprec    # visszajátszás teljes sebességgel + végállapot ellenőrzése
+
+Napló: fejléc (mag, kezdőállapot) | események (művelet, eltelt idő, paraméterek) | FINAL (végállapot)
+"""
+
+import json
+import struct
+import sys
+import time
+
+from lp_game import LPGame
+from lp_savefile import lp_decode_save, lp_encode_save
+from lp_shapes import LPShape
+from lp_stats import LPStats
+
+LP_REC_MAGIC = b"LPRC"
+LP_REC_VERSION = 1
+
+# magic, verzió, mag, kezdési idő, kezdőállapot hossza
+_HEADER = struct.Struct("<4sHQdI")
+# művelet, előző esemény óta eltelt µs, két paraméter
+_EVENT = struct.Struct("<BIdd")
+# művelet, eltelt µs, adat hossza (utána az adat)
+_BLOB = struct.Struct("<BII")
+
+OP_POINTER_DOWN, OP_DRAG_TO, OP_POINTER_UP, OP_ROTATE, OP_SCALE, OP_CHECK, OP_LEVEL = range(1, 8)
+OP_UNDO, OP_REDO = 8, 9
+OP_DIFFICULTY, OP_LOAD, OP_FINAL, OP_MATCH_MODE, OP_BOARD, OP_PACK_BOARD = 20, 21, 22, 23, 24, 25
+_BLOB_OPS = (OP_DIFFICULTY, OP_LOAD, OP_FINAL, OP_MATCH_MODE, OP_BOARD, OP_PACK_BOARD)
+_TEXT_OPS = {"set_difficulty": OP_DIFFICULTY, "set_match_mode": OP_MATCH_MODE, "set_board": OP_BOARD}
+
+_OPS = {
+    "pointer_down": OP_POINTER_DOWN,
+    "drag_to": OP_DRAG_TO,
+    "pointer_up": OP_POINTER_UP,
+    "rotate_active": OP_ROTATE,
+    "scale_active": OP_SCALE,
+    "check_alignment_batch": OP_CHECK,
+    "new_level": OP_LEVEL,
+    "undo": OP_UNDO,
+    "redo": OP_REDO,
+}
+
+
+class LPRecorder:
+    # a játék minden műveletét tömör, csak hozzáfűzött naplóba írja
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.buf = bytearray()
+        self.events = 0
+        self.game = None
+        self._file = None
+        self._last = 0.0
+
+    def start(self, game):
+        self.game = game
+        state = lp_encode_save(game.to_dict())
+        self._last = time.perf_counter()
+        head = _HEADER.pack(LP_REC_MAGIC, LP_REC_VERSION, game.seed, time.time(), len(state)) + state
+        if self.path:
+            self._file = open(self.path, "wb")
+            self._file.write(head)
+        else:
+            self.buf += head
+        game.recorder = self
+
+    def _dt(self) -> int:
+        now = time.perf_counter()
+        dt = min(int((now - self._last) * 1e6), 0xFFFFFFFF)
+        self._last = now
+        return dt
+
+    def _write(self, raw: bytes, flush: bool = False):
+        self.events += 1
+        if self._file is not None:
+            self._file.write(raw)
+            if flush:
+                self._file.flush()
+        else:
+            self.buf += raw
+
+    def event(self, name: str, *args):
+        # a játék hívja minden művelet elején
+        if name in _TEXT_OPS:
+            op = _TEXT_OPS[name]
+            raw = args[0].encode("utf-8")
+            self._write(_BLOB.pack(op, self._dt(), len(raw)) + raw)
+        elif name in ("from_dict", "pack_board"):
+            op = OP_LOAD if name == "from_dict" else OP_PACK_BOARD
+            raw = lp_encode_save(args[0])
+            self._write(_BLOB.pack(op, self._dt(), len(raw)) + raw, flush=op == OP_LOAD)
+        else:
+            op = _OPS[name]
+            a = float(args[0]) if len(args) > 0 else 0.0
+            b = float(args[1]) if len(args) > 1 else 0.0
+            self._write(_EVENT.pack(op, self._dt(), a, b), flush=op in (OP_CHECK, OP_LEVEL))
+
+    def finish(self) -> bytes:
+        game = self.game
+        if game is None:
+            return bytes(self.buf)
+        raw = json.dumps(game.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._write(_BLOB.pack(OP_FINAL, self._dt(), len(raw)) + raw)
+        if game.recorder is self:
+            game.recorder = None
+        self.game = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return bytes(self.buf)
+
+
+def lp_read_recording(data: bytes):
+    magic, version, seed, started, state_len = _HEADER.unpack_from(data, 0)
+    if magic != LP_REC_MAGIC:
+        raise ValueError("nem LP felvétel")
+    if version > LP_REC_VERSION:
+        raise ValueError(f"ismeretlen felvétel verzió: {version}")
+    pos = _HEADER.size
+    initial = lp_decode_save(data[pos:pos + state_len])
+    pos += state_len
+    events = []
+    final = None
+    while pos < len(data):
+        op = data[pos]
+        if op in _BLOB_OPS:
+            if pos + _BLOB.size > len(data):
+                break
+            op, dt, n = _BLOB.unpack_from(data, pos)
+            pos += _BLOB.size
+            raw = data[pos:pos + n]
+            if len(raw) < n:
+                break
+            pos += n
+            if op == OP_FINAL:
+                final = json.loads(raw.decode("utf-8"))
+            else:
+                events.append((op, dt, raw))
+        else:
+            if pos + _EVENT.size > len(data):
+                break
+            op, dt, a, b = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            events.append((op, dt, a, b))
+    return {"seed": seed, "started": started, "initial": initial, "events": events, "final": final}
+
+
+def _comparable(state: dict) -> dict:
+    # a szintidők falióra-függők, ezért csak a próbálkozások számát vetjük össze
+    state = dict(state)
+    stats = state.pop("stats", None) or {}
+    state["attempts"] = stats.get("attempts")
+    return state
+
+
+class _LPRecordedBoard:
+    # a felvételbe írt csomagpálya egyszeri csomagként: a szintváltás ugyanazt a pályát kapja
+    # (a count is a felvételkori, így a mag szerinti választás ugyanannyi véletlent fogyaszt)
+    def __init__(self, state: dict):
+        self.boards = int(state["count"])
+        self.targets = [LPShape.from_dict(d) for d in state["target"]]
+        self.actives = [LPShape.from_dict(d) for d in state["active"]]
+
+    def count(self, level: int) -> int:
+        return self.boards
+
+    def board(self, level: int, index: int):
+        return self.targets, self.actives
+
+
+def lp_replay(data: bytes, game: LPGame | None = None, verify: bool = True) -> dict:
+    rec = lp_read_recording(data)
+    initial = rec["initial"]
+    if game is None:
+        total = int(initial.get("level_count", 5))
+        game = LPGame(width=int(initial.get("width", 1600)), height=int(initial.get("height", 900)),
+                      level_count=total, stats=LPStats(total_levels=total), seed=rec["seed"])
+    game.stats.from_dict(initial.get("stats", {}))
+    game.from_dict(initial)
+
+    t0 = time.perf_counter()
+    pack_board = None
+    for ev in rec["events"]:
+        op = ev[0]
+        if op == OP_POINTER_DOWN:
+            game.pointer_down(ev[2], ev[3])
+        elif op == OP_DRAG_TO:
+            game.drag_to(ev[2], ev[3])
+        elif op == OP_POINTER_UP:
+            game.pointer_up(ev[2], ev[3])
+        elif op == OP_ROTATE:
+            game.rotate_active(ev[2])
+        elif op == OP_SCALE:
+            game.scale_active(ev[2])
+        elif op == OP_CHECK:
+            game.check_alignment_batch()
+        elif op == OP_UNDO:
+            game.undo()
+        elif op == OP_REDO:
+            game.redo()
+        elif op == OP_LEVEL:
+            game.level = int(ev[2])
+            game.lives = int(ev[3])
+            pack, game.pack = game.pack, pack_board
+            game.new_level()
+            game.pack, pack_board = pack, None
+        elif op == OP_PACK_BOARD:
+            pack_board = _LPRecordedBoard(lp_decode_save(ev[2]))
+        elif op == OP_DIFFICULTY:
+            game.set_difficulty(ev[2].decode("utf-8"))
+        elif op == OP_MATCH_MODE:
+            game.set_match_mode(ev[2].decode("utf-8"))
+        elif op == OP_BOARD:
+            size, pairs = ev[2].decode("utf-8").split(":")
+            width, height = size.split("x")
+            game.set_board(int(width), int(height), int(pairs) or None)
+        elif op == OP_LOAD:
+            game.from_dict(lp_decode_save(ev[2]))
+    elapsed = time.perf_counter() - t0
+
+    result = {
+        "events": len(rec["events"]),
+        "seconds": elapsed,
+        "events_per_sec": len(rec["events"]) / elapsed if elapsed > 0 else float("inf"),
+        "recorded_seconds": sum(ev[1] for ev in rec["events"]) / 1e6,
+        "game": game,
+        "ok": None,
+        "mismatch": [],
+    }
+    if verify and rec["final"] is not None:
+        want = _comparable(rec["final"])
+        got = _comparable(game.to_dict())
+        result["mismatch"] = sorted(k for k in want.keys() | got.keys() if want.get(k) != got.get(k))
+        result["ok"] = not result["mismatch"]
+    return result
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("használat: python lp_replay.py FELVÉTEL.lprec")
+        return 2
+    with open(argv[0], "rb") as f:
+        res = lp_replay(f.read())
+    print(f"{res['events']} esemény, {res['seconds'] * 1000:.1f} ms "
+          f"({res['events_per_sec']:.0f} esemény/s; eredetileg {res['recorded_seconds']:.1f} s)")
+    if res["ok"] is None:
+        print("nincs rögzített végállapot, ellenőrzés kihagyva")
+        return 0
+    print("végállapot egyezik" if res["ok"] else f"ELTÉRÉS: {', '.join(res['mismatch'])}")
+    return 0 if res["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+# CREATED BY Laczi Péter - R9SAAO
+"""
+Tömör bináris mentés (.lpsave) és autosave napló.
+
+Mentés: fejléc | meta JSON | színtábla | aktív rekordok | cél rekordok
+Napló:  fejléc | rekordok ... ; csak a legutóbbi COMMIT-ig érvényes
+"""
+
+import json
+import os
+import struct
+import tempfile
+import time
+
+LP_SAVE_MAGIC = b"LPSV"
+LP_SAVE_VERSION = 1
+LP_JOURNAL_MAGIC = b"LPJN"
+
+# magic, verzió, generáció, meta hossz, aktív db, cél db
+_HEADER = struct.Struct("<4sHIIII")
+# azonosító, cx, cy, méret, forgatás, oldalszám, szín index
+_SHAPE = struct.Struct("<IiiidBB")
+_JHEADER = struct.Struct("<4sHI")
+_OP = struct.Struct("<B")
+_JSHAPE = struct.Struct("<BI")
+# cx, cy, méret, forgatás, oldalszám, szín hossza (utána a szín bájtjai)
+_JREC = struct.Struct("<iiidBB")
+_JMETA = struct.Struct("<I")
+_JCOMMIT = struct.Struct("<d")
+
+OP_UPSERT, OP_REMOVE, OP_META, OP_COMMIT = 1, 2, 3, 4
+_TABLES = ("active", "target")
+
+
+def _read_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# egyszer, importáláskor olvassuk ki: az os.umask folyamatszintű, a mentés pedig háttérszálon fut
+_UMASK = _read_umask()
+
+
+def _fsync_dir(folder: str):
+    # az átnevezés csak a mappa lemezre írásával tartós; Windowson mappa nem nyitható meg így
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def lp_atomic_write(path: str, data: bytes):
+    # ideiglenes fájlba ír, majd átnevez és a mappát is lemezre írja: összeomláskor a régi mentés ép marad
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".lp_", suffix=".tmp", dir=folder)
+    try:
+        # a mkstemp 0600-as jogát a szokásos (umask szerinti) jogra állítjuk
+        os.chmod(tmp, 0o666 & ~_UMASK)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(folder)
+
+
+def lp_is_binary_save(data: bytes) -> bool:
+    return bytes(data[:4]) == LP_SAVE_MAGIC
+
+
+def _record(d: dict, colors: dict):
+    color = d.get("color", "#6cb6ff")
+    if color not in colors:
+        colors[color] = len(colors)
+    return (int(d["cx"]), int(d["cy"]), int(d["size"]), float(d["rotation"]), int(d["sides"]), colors[color])
+
+
+def lp_encode_save(state: dict, generation: int = 0) -> bytes:
+    meta = {k: v for k, v in state.items() if k not in ("active", "target", "active_ids", "target_ids")}
+    meta_raw = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    colors = {}
+    body = []
+    counts = []
+    for table in _TABLES:
+        shapes = state.get(table, [])
+        ids = state.get(table + "_ids") or range(len(shapes))
+        counts.append(len(shapes))
+        for sid, d in zip(ids, shapes):
+            body.append(_SHAPE.pack(sid, *_record(d, colors)))
+    if len(colors) > 255:
+        raise ValueError("legfeljebb 255 különböző szín menthető")
+    color_raw = bytearray([len(colors)])
+    for color in colors:
+        raw = color.encode("utf-8")
+        color_raw.append(len(raw))
+        color_raw += raw
+    head = _HEADER.pack(LP_SAVE_MAGIC, LP_SAVE_VERSION, generation, len(meta_raw), *counts)
+    return b"".join([head, meta_raw, bytes(color_raw)] + body)
+
+
+def lp_decode_save(data: bytes) -> dict:
+    view = memoryview(data)
+    magic, version, generation, meta_len, n_active, n_target = _HEADER.unpack_from(view, 0)
+    if magic != LP_SAVE_MAGIC:
+        raise ValueError("nem LP mentés")
+    if version > LP_SAVE_VERSION:
+        raise ValueError(f"ismeretlen mentés verzió: {version}")
+    pos = _HEADER.size
+    state = json.loads(bytes(view[pos:pos + meta_len]).decode("utf-8"))
+    pos += meta_len
+    colors = []
+    n_colors = view[pos]
+    pos += 1
+    for _ in range(n_colors):
+        n = view[pos]
+        colors.append(bytes(view[pos + 1:pos + 1 + n]).decode("utf-8"))
+        pos += 1 + n
+    for table, count in zip(_TABLES, (n_active, n_target)):
+        shapes = []
+        ids = []
+        for sid, cx, cy, size, rot, sides, color in _SHAPE.iter_unpack(view[pos:pos + count * _SHAPE.size]):
+            ids.append(sid)
+            shapes.append({"cx": cx, "cy": cy, "size": size, "rotation": rot, "sides": sides, "color": colors[color]})
+        pos += count * _SHAPE.size
+        state[table] = shapes
+        state[table + "_ids"] = ids
+    state["generation"] = generation
+    return state
+
+
+def lp_save_binary(path: str, state: dict, generation: int = 0):
+    lp_atomic_write(path, lp_encode_save(state, generation))
+
+
+def lp_load_binary(path: str) -> dict:
+    with open(path, "rb") as f:
+        return lp_decode_save(f.read())
+
+
+class LPJournal:
+    # autosave: pillanatkép + csak hozzáfűzött napló a legutóbbi pillanatkép óta történt változásokról
+    # a bemenet a game.to_dict() eredménye (stabil azonosítókkal); a napló így háttérszálon is futhat,
+    # amíg minden hívás ugyanarról az egy szálról érkezik
+    def __init__(self, snapshot_path: str, compact_every: int = 512):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + ".journal"
+        self.compact_every = compact_every
+        self.generation = 0
+        self.records = 0
+        self._shapes = {}
+        self._meta_raw = None
+        self._level_key = None
+
+    def _meta_of(self, state: dict) -> dict:
+        return {k: v for k, v in state.items()
+                if k not in ("active", "target", "active_ids", "target_ids", "generation")}
+
+    def _meta_bytes(self, state: dict) -> bytes:
+        return json.dumps(self._meta_of(state), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def snapshot(self, state: dict):
+        # véletlen generáció: egy korábbi futás naplója sosem illeszkedik az új pillanatképhez
+        self.generation = int.from_bytes(os.urandom(4), "little")
+        lp_save_binary(self.snapshot_path, state, self.generation)
+        with open(self.journal_path, "wb") as f:
+            f.write(_JHEADER.pack(LP_JOURNAL_MAGIC, 1, self.generation))
+        self._shapes = self._collect(state)
+        self._meta_raw = self._meta_bytes(state)
+        self._level_key = (state["level"], state.get("seed"))
+        self.records = 0
+
+    def _collect(self, state: dict) -> dict:
+        shapes = {}
+        for t, table in enumerate(_TABLES):
+            for sid, d in zip(state[table + "_ids"], state[table]):
+                shapes[(t, sid)] = (int(d["cx"]), int(d["cy"]), int(d["size"]), float(d["rotation"]),
+                                    int(d["sides"]), d.get("color", "#6cb6ff"))
+        return shapes
+
+    def record(self, state: dict) -> int:
+        # a legutóbbi rögzítés óta megváltozott alakzatokat írja a naplóba; visszaadja a rekordok számát
+        if self._meta_raw is None or (state["level"], state.get("seed")) != self._level_key:
+            self.snapshot(state)
+            return 0
+        shapes = self._collect(state)
+        out = bytearray()
+        n = 0
+        for key, rec in shapes.items():
+            if self._shapes.get(key) != rec:
+                color = rec[5].encode("utf-8")
+                out += _OP.pack(OP_UPSERT) + _JSHAPE.pack(*key)
+                out += _JREC.pack(*rec[:5], len(color)) + color
+                n += 1
+        for key in self._shapes.keys() - shapes.keys():
+            out += _OP.pack(OP_REMOVE) + _JSHAPE.pack(*key)
+            n += 1
+        raw = self._meta_bytes(state)
+        if raw != self._meta_raw:
+            out += _OP.pack(OP_META) + _JMETA.pack(len(raw)) + raw
+            n += 1
+        if not n:
+            return 0
+        out += _OP.pack(OP_COMMIT) + _JCOMMIT.pack(time.time())
+        with open(self.journal_path, "ab") as f:
+            f.write(out)
+            f.flush()
+            os.fsync(f.fileno())
+        self._shapes = shapes
+        self._meta_raw = raw
+        self.records += n
+        if self.records >= self.compact_every:
+            self.snapshot(state)
+        return n
+
+    def recover(self) -> dict | None:
+        # pillanatkép + a napló utolsó teljes (COMMIT-tal lezárt) blokkjáig
+        try:
+            state = lp_load_binary(self.snapshot_path)
+        except (OSError, ValueError, struct.error):
+            return None
+        shapes = {}
+        for t, table in enumerate(_TABLES):
+            for sid, d in zip(state[table + "_ids"], state[table]):
+                shapes[(t, sid)] = d
+        meta = self._meta_of(state)
+        try:
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        if len(data) >= _JHEADER.size:
+            magic, _version, generation = _JHEADER.unpack_from(data, 0)
+            if magic == LP_JOURNAL_MAGIC and generation == state["generation"]:
+                shapes, meta = self._replay(data, shapes, meta)
+        for t, table in enumerate(_TABLES):
+            keys = sorted(k for k in shapes if k[0] == t)
+            meta[table] = [shapes[k] for k in keys]
+            meta[table + "_ids"] = [k[1] for k in keys]
+        return meta
+
+    def _replay(self, data: bytes, shapes: dict, meta: dict):
+        pos = _JHEADER.size
+        pending_shapes = dict(shapes)
+        pending_meta = dict(meta)
+        try:
+            while pos < len(data):
+                (op,) = _OP.unpack_from(data, pos)
+                pos += _OP.size
+                if op == OP_UPSERT:
+                    key = _JSHAPE.unpack_from(data, pos)
+                    pos += _JSHAPE.size
+                    cx, cy, size, rot, sides, n = _JREC.unpack_from(data, pos)
+                    pos += _JREC.size
+                    color = data[pos:pos + n].decode("utf-8")
+                    pos += n
+                    pending_shapes[key] = {"cx": cx, "cy": cy, "size": size, "rotation": rot,
+                                           "sides": sides, "color": color}
+                elif op == OP_REMOVE:
+                    key = _JSHAPE.unpack_from(data, pos)
+                    pos += _JSHAPE.size
+                    pending_shapes.pop(key, None)
+                elif op == OP_META:
+                    (n,) = _JMETA.unpack_from(data, pos)
+                    pos += _JMETA.size
+                    pending_meta = json.loads(data[pos:pos + n].decode("utf-8"))
+                    pos += n
+                elif op == OP_COMMIT:
+                    pos += _JCOMMIT.size
+                    if pos > len(data):
+                        break
+                    shapes, meta = dict(pending_shapes), dict(pending_meta)
+                else:
+                    break
+        except (struct.error, UnicodeDecodeError, ValueError):
+            # félbeszakadt utolsó blokk: az utolsó COMMIT állapota marad
+            pass
+        return shapes, meta
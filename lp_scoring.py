@@ -0,0 +1,149 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import numpy as np
+
+from lp_utils import LP_THRESHOLDS
+
+# oszlopok a tömbös (struct-of-arrays) alakban
+LP_CX, LP_CY, LP_SIZE, LP_ROT = range(4)
+
+
+def lp_thresholds(difficulty: str, override=None) -> np.ndarray:
+    # override: (pozíció, forgatás, méretarány) a nehézség alapértéke helyett
+    if override is None:
+        override = LP_THRESHOLDS.get(difficulty, LP_THRESHOLDS["normal"])
+    return np.asarray(override, dtype=np.float64)
+
+
+def lp_shape_arrays(shapes) -> np.ndarray:
+    arr = np.empty((len(shapes), 4), dtype=np.float64)
+    for k, sh in enumerate(shapes):
+        arr[k] = (sh.cx, sh.cy, sh.size, sh.rotation)
+    return arr
+
+
+def lp_score_pairs(active: np.ndarray, target: np.ndarray, thresholds):
+    # active/target: (..., 4); visszaad: hibák (..., 3) és megfelelt maszk (...)
+    # több pálya egyszerre is pontozható: (táblák, párok, 4) alakú tömbökkel
+    d = np.hypot(active[..., LP_CX] - target[..., LP_CX], active[..., LP_CY] - target[..., LP_CY])
+    d = np.where(d < 1.0, 0.0, d)
+    rot = np.mod(active[..., LP_ROT] - target[..., LP_ROT], 360.0)
+    rot = np.minimum(rot, 360.0 - rot)
+    scale = np.abs(active[..., LP_SIZE] - target[..., LP_SIZE]) / target[..., LP_SIZE]
+
+    errors = np.stack((d, rot, scale), axis=-1)
+    thr = np.asarray(thresholds, dtype=np.float64)
+    if thr.ndim > 1:
+        # táblánkénti küszöbök: (táblák, 3) -> (táblák, 1, 3)
+        thr = thr.reshape(thr.shape[:-1] + (1,) * (errors.ndim - thr.ndim) + thr.shape[-1:])
+    ok = np.all(errors <= thr, axis=-1)
+    return errors, ok
+
+
+def lp_pack_boards(boards):
+    # boards: [(aktív alakzatok, cél alakzatok), ...] -> kitöltött (B, N, 4) tömbök + érvényességi maszk
+    n = max((len(a) for a, _ in boards), default=0)
+    active = np.full((len(boards), n, 4), np.nan)
+    target = np.full((len(boards), n, 4), np.nan)
+    valid = np.zeros((len(boards), n), dtype=bool)
+    for b, (a, t) in enumerate(boards):
+        k = len(a)
+        if k:
+            active[b, :k] = lp_shape_arrays(a)
+            target[b, :k] = lp_shape_arrays(t)
+            valid[b, :k] = True
+    return active, target, valid
+
+
+def lp_score_boards(boards, thresholds):
+    active, target, valid = lp_pack_boards(boards)
+    with np.errstate(invalid="ignore"):
+        errors, ok = lp_score_pairs(active, target, thresholds)
+    return errors, ok & valid, valid
+
+
+def lp_linear_assignment(cost):
+    # minimális összköltségű hozzárendelés (magyar módszer, potenciálokkal, O(n²m));
+    # visszaad: (sorok, oszlopok) indexpárok, mint a scipy linear_sum_assignment
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.ndim != 2:
+        raise ValueError("a költségmátrix kétdimenziós kell legyen")
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    # a végtelen (tiltott) párok helyett egy minden megengedett hozzárendelésnél nagyobb költség
+    finite = np.isfinite(cost)
+    big = (np.abs(cost[finite]).max() + 1.0) * (n + 1) if finite.any() else 1.0
+    cost = np.where(finite, cost, big)
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.intp)
+    way = np.zeros(m + 1, dtype=np.intp)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            free[0] = False
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            masked = np.where(free, minv, np.inf)
+            j1 = int(np.argmin(masked))
+            delta = masked[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    order = np.argsort(rows)
+    rows, cols = rows[order], cols[order]
+    if transposed:
+        rows, cols = cols, rows
+        order = np.argsort(rows)
+        rows, cols = rows[order], cols[order]
+    return rows, cols
+
+
+def lp_assignment_cost(active: np.ndarray, target: np.ndarray, thresholds, active_sides=None, target_sides=None):
+    # (aktív, cél) költségmátrix: a hibák a küszöbökhöz mérve összeadva;
+    # küszöbön kívüli vagy eltérő oldalszámú pár: végtelen
+    thr = np.asarray(thresholds, dtype=np.float64)
+    errors, ok = lp_score_pairs(active[:, None, :], target[None, :, :], thr)
+    if active_sides is not None and target_sides is not None:
+        ok &= np.asarray(active_sides)[:, None] == np.asarray(target_sides)[None, :]
+    cost = (errors / thr).sum(axis=-1)
+    cost[~ok] = np.inf
+    return cost
+
+
+def lp_match_selection(active: np.ndarray, target: np.ndarray, thresholds, active_sides=None, target_sides=None):
+    # a kijelölt aktív alakzatokhoz a legkisebb összhibájú, különböző célokat rendeli;
+    # visszaad: oszlopindex minden aktív sorhoz (-1: nincs megfelelő cél) és hogy mind megfelelt-e
+    cols = np.full(len(active), -1, dtype=np.intp)
+    if len(active) == 0:
+        return cols, True
+    if len(target) < len(active):
+        return cols, False
+    cost = lp_assignment_cost(active, target, thresholds, active_sides, target_sides)
+    rows, assigned = lp_linear_assignment(cost)
+    good = np.isfinite(cost[rows, assigned])
+    cols[rows[good]] = assigned[good]
+    return cols, bool(good.all() and len(rows) == len(active))
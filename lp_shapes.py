@@ -1,8 +1,34 @@
 # CREATED BY Laczi Péter - R9SAAO
 
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
+import cmath
 import math
 
+_LP_GEOMETRY = frozenset(("cx", "cy", "size", "rotation", "sides"))
+_LP_UNIT_CIRCLES = {}
+
+
+def _lp_unit_circle(sides: int):
+    # egységkör csúcsai oldalszámonként, egyszer kiszámolva
+    table = _LP_UNIT_CIRCLES.get(sides)
+    if table is None:
+        step = 2 * math.pi / sides
+        table = tuple(cmath.rect(1.0, step * k) for k in range(sides))
+        _LP_UNIT_CIRCLES[sides] = table
+    return table
+
+
+def lp_polygon(cx, cy, size, rotation, sides):
+    center = complex(cx, cy)
+    rot = cmath.rect(size, math.radians(rotation))
+    flat = []
+    for u in _lp_unit_circle(sides):
+        p = center + rot * u
+        flat.append(p.real)
+        flat.append(p.imag)
+    return tuple(flat)
+
 
 @dataclass
 class LPShape:
@@ -12,22 +38,28 @@ class LPShape:
     rotation: float
     sides: int
     color: str = "#6cb6ff"  # kék (aktív)
+    items: tuple = field(default=(), repr=False, compare=False)  # canvas elemek: (polygon, pont)
+    _poly: tuple | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        # geometria változásakor a csúcs cache érvénytelen
+        if name in _LP_GEOMETRY:
+            object.__setattr__(self, "_poly", None)
+        object.__setattr__(self, name, value)
 
     def polygon(self):
-        r = self.size
-        ang0 = math.radians(self.rotation)
-        pts = []
-        for k in range(self.sides):
-            a = ang0 + 2 * math.pi * k / self.sides
-            x = self.cx + r * math.cos(a)
-            y = self.cy + r * math.sin(a)
-            pts.extend((x, y))
+        pts = self._poly
+        if pts is None:
+            pts = lp_polygon(self.cx, self.cy, self.size, self.rotation, self.sides)
+            self._poly = pts
         return pts
 
     def contains(self, x, y) -> bool:
-        # egyszerű kör-alapú becslés
+        # gyors kizárás a befoglaló körrel, utána pontos sugárkövetéses teszt
         dx, dy = x - self.cx, y - self.cy
-        return (dx*dx + dy*dy) <= (self.size * 1.1) ** 2
+        if (dx*dx + dy*dy) > self.size * self.size:
+            return False
+        return lp_point_in_polygon(x, y, self.polygon())
 
     def as_dict(self):
         return {
@@ -44,21 +76,234 @@ class LPShape:
         )
 
 
+def _lp_column(name, cast):
+    # oszlop-hozzáférés a nézeten keresztül; geometria írásakor a csúcs cache törlődik
+    def fget(self):
+        t = self.table
+        return getattr(t, name)[self._row_index()]
+
+    def fset(self, value):
+        t = self.table
+        row = self._row_index()
+        getattr(t, name)[row] = cast(value)
+        t._poly[row] = None
+
+    return property(fget, fset)
+
+
+def _lp_int(value):
+    return int(round(value))
+
+
+class LPShapeRef:
+    # könnyű nézet egy tábla-sorra, az LPShape attribútum API-jával
+    __slots__ = ("table", "id")
+
+    def __init__(self, table, sid):
+        self.table = table
+        self.id = sid
+
+    def _row_index(self):
+        # a nézet túlélheti az alakzatot (visszavonás, nézetablak): törölt azonosítóra KeyError, nem egy másik sor
+        try:
+            row = self.table._row[self.id]
+        except IndexError:
+            raise KeyError(self.id) from None
+        if row < 0:
+            raise KeyError(self.id)
+        return row
+
+    cx = _lp_column("cx", _lp_int)
+    cy = _lp_column("cy", _lp_int)
+    size = _lp_column("size", _lp_int)
+    rotation = _lp_column("rotation", float)
+    sides = _lp_column("sides", int)
+
+    @property
+    def color(self):
+        t = self.table
+        return t.color[self._row_index()]
+
+    @color.setter
+    def color(self, value):
+        t = self.table
+        t.color[self._row_index()] = value
+
+    @property
+    def items(self):
+        t = self.table
+        return t.items[self._row_index()]
+
+    @items.setter
+    def items(self, value):
+        t = self.table
+        t.items[self._row_index()] = value
+
+    def __repr__(self):
+        return f"LPShapeRef(id={self.id}, {self.as_dict()})"
+
+    def polygon(self):
+        t = self.table
+        row = self._row_index()
+        pts = t._poly[row]
+        if pts is None:
+            pts = lp_polygon(t.cx[row], t.cy[row], t.size[row], t.rotation[row], t.sides[row])
+            t._poly[row] = pts
+        return pts
+
+    def contains(self, x, y) -> bool:
+        t = self.table
+        row = self._row_index()
+        dx, dy = x - t.cx[row], y - t.cy[row]
+        r = t.size[row]
+        if (dx*dx + dy*dy) > r * r:
+            return False
+        return lp_point_in_polygon(x, y, self.polygon())
+
+    def as_dict(self):
+        t = self.table
+        row = self._row_index()
+        return {
+            "cx": t.cx[row], "cy": t.cy[row], "size": t.size[row],
+            "rotation": t.rotation[row], "sides": t.sides[row], "color": t.color[row]
+        }
+
+    def to_shape(self) -> LPShape:
+        return LPShape.from_dict(self.as_dict())
+
+
+class LPShapeTable:
+    # tömb-alapú alakzattár: stabil azonosítók, O(1) törlés az utolsó sor áthelyezésével
+    __slots__ = ("cx", "cy", "size", "rotation", "sides", "color", "ids", "items", "_poly", "_row", "_next_id")
+
+    def __init__(self, shapes=()):
+        self.cx = array("i")
+        self.cy = array("i")
+        self.size = array("i")
+        self.rotation = array("d")
+        self.sides = array("B")
+        self.color = []
+        self.ids = array("q")
+        self.items = []
+        self._poly = []
+        self._row = array("q")  # azonosító -> sor, törölt azonosítónál -1
+        self._next_id = 0
+        for sh in shapes:
+            self.add(sh)
+
+    def _columns(self):
+        return (self.cx, self.cy, self.size, self.rotation, self.sides,
+                self.color, self.ids, self.items, self._poly)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, sid):
+        return 0 <= sid < len(self._row) and self._row[sid] >= 0
+
+    def __getitem__(self, sid) -> LPShapeRef:
+        if sid not in self:
+            raise KeyError(sid)
+        return LPShapeRef(self, sid)
+
+    def __iter__(self):
+        # sorrend a tárolási sorrend (törlés után nem a létrehozási)
+        for sid in list(self.ids):
+            yield LPShapeRef(self, sid)
+
+    def ordered(self):
+        # létrehozási (rajzolási) sorrend
+        for sid in sorted(self.ids):
+            yield LPShapeRef(self, sid)
+
+    def add(self, shape, sid: int | None = None) -> int:
+        if sid is None:
+            sid = self._next_id
+        elif sid in self:
+            raise KeyError(f"foglalt azonosító: {sid}")
+        self._next_id = max(self._next_id, sid + 1)
+        if sid >= len(self._row):
+            self._row.extend([-1] * (sid + 1 - len(self._row)))
+        self._row[sid] = len(self.ids)
+        self.cx.append(_lp_int(shape.cx))
+        self.cy.append(_lp_int(shape.cy))
+        self.size.append(_lp_int(shape.size))
+        self.rotation.append(float(shape.rotation))
+        self.sides.append(int(shape.sides))
+        self.color.append(shape.color)
+        self.ids.append(sid)
+        self.items.append(())
+        self._poly.append(None)
+        return sid
+
+    def remove(self, sid):
+        if sid not in self:
+            raise KeyError(sid)
+        row = self._row[sid]
+        self._row[sid] = -1
+        last = len(self.ids) - 1
+        cols = self._columns()
+        if row != last:
+            for col in cols:
+                col[row] = col[last]
+            self._row[self.ids[row]] = row
+        for col in cols:
+            col.pop()
+
+    def clear(self):
+        for col in self._columns():
+            del col[:]
+        del self._row[:]
+        self._next_id = 0
+
+
+def lp_point_in_polygon(x, y, pts) -> bool:
+    inside = False
+    n = len(pts)
+    x1, y1 = pts[n - 2], pts[n - 1]
+    for k in range(0, n, 2):
+        x2, y2 = pts[k], pts[k + 1]
+        if (y2 > y) != (y1 > y):
+            if x < (x1 - x2) * (y - y2) / (y1 - y2) + x2:
+                inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
 def lp_draw_shape(canvas, shape: LPShape):
-    canvas.create_polygon(
+    poly = canvas.create_polygon(
         shape.polygon(), outline=shape.color, width=7, fill="", tags=("active",)
     )
-    canvas.create_oval(
+    dot = canvas.create_oval(
         shape.cx-2, shape.cy-2, shape.cx+2, shape.cy+2,
         fill=shape.color, outline="", tags=("active",)
     )
+    shape.items = (poly, dot)
 
 
 def lp_draw_ghost_shape(canvas, shape: LPShape):
-    canvas.create_polygon(
+    poly = canvas.create_polygon(
         shape.polygon(), outline="#3fb950", width=5, dash=(4, 4), fill="", tags=("ghost",)
     )
-    canvas.create_oval(
+    dot = canvas.create_oval(
         shape.cx-2, shape.cy-2, shape.cx+2, shape.cy+2,
         fill="#3fb950", outline="", tags=("ghost",)
     )
+    shape.items = (poly, dot)
+
+
+def lp_update_shape(canvas, shape: LPShape):
+    # meglévő canvas elemek áthelyezése újralétrehozás helyett
+    if not shape.items:
+        lp_draw_shape(canvas, shape)
+        return
+    poly, dot = shape.items
+    canvas.coords(poly, shape.polygon())
+    canvas.coords(dot, shape.cx-2, shape.cy-2, shape.cx+2, shape.cy+2)
+
+
+def lp_remove_shape(canvas, shape: LPShape):
+    # csak az alakzat saját elemei törlődnek, a jelenet többi része marad
+    for item in shape.items or ():
+        canvas.delete(item)
+    shape.items = None
@@ -0,0 +1,72 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+
+class LPSpatialGrid:
+    # egyenletes rács: minden kulcs a befoglaló köre által érintett cellákban szerepel
+
+    def __init__(self, cell: float = 128.0):
+        self.cell = float(cell)
+        self.cells = {}
+        self.bounds = {}
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def __contains__(self, key):
+        return key in self.bounds
+
+    def _span(self, x, y, r):
+        c = self.cell
+        return int((x - r) // c), int((y - r) // c), int((x + r) // c), int((y + r) // c)
+
+    def clear(self):
+        self.cells.clear()
+        self.bounds.clear()
+
+    def insert(self, key, x, y, r):
+        if key in self.bounds:
+            self.update(key, x, y, r)
+            return
+        span = self._span(x, y, r)
+        self.bounds[key] = span
+        i0, j0, i1, j1 = span
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                self.cells.setdefault((i, j), set()).add(key)
+
+    def remove(self, key):
+        span = self.bounds.pop(key, None)
+        if span is None:
+            return
+        i0, j0, i1, j1 = span
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                bucket = self.cells.get((i, j))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self.cells[(i, j)]
+
+    def update(self, key, x, y, r):
+        # csak akkor nyúl a cellákhoz, ha a lefedett tartomány változott
+        if self.bounds.get(key) == self._span(x, y, r):
+            return
+        self.remove(key)
+        self.insert(key, x, y, r)
+
+    def query_point(self, x, y):
+        c = self.cell
+        return self.cells.get((int(x // c), int(y // c)), ())
+
+    def query_rect(self, x0, y0, x1, y1):
+        c = self.cell
+        found = set()
+        for i in range(int(x0 // c), int(x1 // c) + 1):
+            for j in range(int(y0 // c), int(y1 // c) + 1):
+                bucket = self.cells.get((i, j))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def query_radius(self, x, y, r):
+        return self.query_rect(x - r, y - r, x + r, y + r)
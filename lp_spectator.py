@@ -0,0 +1,308 @@
+# CREATED BY Laczi Péter - R9SAAO
+"""
+Élő nézői ablak egy futó játékhoz, ugyanazon a gépen (osztott memória, zár nélküli olvasás).
+
+    python lp_spectator.py lp_spec_12345        # a játék Játék → Nézői ablak menüje maga indítja
+
+A játék képkockánként legfeljebb egyszer a közös memóriába másolja az alakzattáblák oszlopait
+(nem JSON, nem to_dict); a néző a sorszám (seqlock) alapján ellenőrzi, hogy következetes
+pillanatképet olvasott-e. A játékos oldalán a költség független a nézők számától.
+"""
+
+import argparse
+import os
+import struct
+import sys
+from array import array
+from multiprocessing import shared_memory
+
+LP_SPEC_MAGIC = b"LPSP"
+LP_SPEC_VERSION = 1
+LP_SPEC_SLOTS = 3  # körpuffer: az író mindig a legutóbb közzétett utáni rekeszbe ír
+LP_SPEC_CAPACITY = 8192  # rétegenként legfeljebb ennyi alakzat
+LP_SPEC_MAX_SEL = 64
+LP_SPEC_PUBLISH_MS = 33  # a játék legfeljebb ilyen gyakran tesz közzé új állapotot
+
+# magic, verzió, rekeszek, kapacitás, állapot (1: fut, 0: a játék kilépett), legutóbbi képkocka sorszáma
+_HEADER = struct.Struct("<4sIIIIxxxxQ")
+# seqlock sorszám (páratlan: írás folyamatban), szint, szintek, életek, világ szélesség / magasság,
+# aktív / cél / kijelölt darabszám, fókusz id (-1: nincs)
+_SLOT_HEAD = struct.Struct("<QIIIIIIIIq")
+# rétegenkénti oszlopok: (típus, elemméret), a LPShapeTable oszlopaival azonos ábrázolás
+_COLUMNS = (("ids", "q", 8), ("rotation", "d", 8), ("cx", "i", 4), ("cy", "i", 4), ("size", "i", 4),
+            ("sides", "B", 1))
+_LAYER_BYTES = sum(size for _name, _code, size in _COLUMNS)
+
+
+def _slot_size(capacity: int) -> int:
+    return _SLOT_HEAD.size + 2 * _LAYER_BYTES * capacity + 8 * LP_SPEC_MAX_SEL
+
+
+def _layer_offsets(base: int, layer: int, capacity: int):
+    # oszlopnév -> (eltolás, típus, elemméret); 8 bájtos oszlopok elöl, így igazítottak maradnak
+    off = base + _SLOT_HEAD.size + layer * _LAYER_BYTES * capacity
+    out = {}
+    for name, code, size in _COLUMNS:
+        out[name] = (off, code, size)
+        off += size * capacity
+    return out
+
+
+class LPSpectatorPublisher:
+    # a játék folyamatában fut; a publish() képkockánként egyszer hívható, a nézők számától független
+    def __init__(self, game, name: str | None = None, capacity: int = LP_SPEC_CAPACITY):
+        self.game = game
+        self.capacity = capacity
+        self.frame = 0
+        self.truncated = False
+        self._slot = _slot_size(capacity)
+        self.shm = shared_memory.SharedMemory(name=name or f"lp_spec_{os.getpid()}", create=True,
+                                              size=_HEADER.size + LP_SPEC_SLOTS * self._slot)
+        self.name = self.shm.name
+        self._write_header(1)
+
+    def _write_header(self, state: int):
+        _HEADER.pack_into(self.shm.buf, 0, LP_SPEC_MAGIC, LP_SPEC_VERSION, LP_SPEC_SLOTS, self.capacity, state,
+                          self.frame)
+
+    def publish(self):
+        game = self.game
+        buf = self.shm.buf
+        frame = self.frame + 1
+        base = _HEADER.size + (frame % LP_SPEC_SLOTS) * self._slot
+        seq = struct.unpack_from("<Q", buf, base)[0]
+        # seqlock: páratlan sorszám, amíg a rekesz tartalma változik
+        struct.pack_into("<Q", buf, base, seq + 1)
+        counts = []
+        for layer, table in enumerate((game.active_shapes, game.target_shapes)):
+            n = len(table)
+            if n > self.capacity:
+                n = self.capacity
+                self.truncated = True
+            counts.append(n)
+            for name, (off, _code, size) in _layer_offsets(base, layer, self.capacity).items():
+                # az oszlop bájtjai egyetlen másolással kerülnek át
+                buf[off:off + n * size] = memoryview(getattr(table, name))[:n].cast("B")
+        sel = sorted(game.selected_ids)[:LP_SPEC_MAX_SEL]
+        sel_off = base + _SLOT_HEAD.size + 2 * _LAYER_BYTES * self.capacity
+        struct.pack_into(f"<{len(sel)}q", buf, sel_off, *sel)
+        focus = game.focus_id if game.focus_id is not None else -1
+        _SLOT_HEAD.pack_into(buf, base, seq + 2, game.level, game.level_count, game.lives, game.width, game.height,
+                             counts[0], counts[1], len(sel), focus)
+        self.frame = frame
+        self._write_header(1)
+
+    def close(self):
+        # a nézők látják, hogy a játék kilépett; a szegmens a nevével együtt megszűnik
+        self._write_header(0)
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class LPSpectatorReader:
+    # a néző folyamatban: zár nélkül olvas, a sorszámok egyezése igazolja a következetes pillanatképet
+    def __init__(self, name: str):
+        self.shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # a néző nem birtokolja a szegmenst: kilépéskor ne törölje a játék alól
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        magic, version, self.slots, self.capacity, _state, _frame = _HEADER.unpack_from(self.shm.buf, 0)
+        if magic != LP_SPEC_MAGIC or version != LP_SPEC_VERSION:
+            self.shm.close()
+            raise ValueError("nem LP nézői szegmens")
+        self._slot = _slot_size(self.capacity)
+        self.frame = None
+        self.retries = 0
+
+    @property
+    def running(self) -> bool:
+        return _HEADER.unpack_from(self.shm.buf, 0)[4] == 1
+
+    def read(self, max_tries: int = 8):
+        # új pillanatkép (dict), vagy None, ha nincs újabb a legutóbb olvasottnál
+        buf = self.shm.buf
+        for _ in range(max_tries):
+            frame = _HEADER.unpack_from(buf, 0)[5]
+            if frame == self.frame or frame == 0:
+                return None
+            base = _HEADER.size + (frame % self.slots) * self._slot
+            head = _SLOT_HEAD.unpack_from(buf, base)
+            seq = head[0]
+            if seq & 1:
+                self.retries += 1
+                continue
+            snap = self._decode(buf, base, head)
+            if struct.unpack_from("<Q", buf, base)[0] != seq:
+                # az író közben felülírta a rekeszt: újra a legfrissebbel
+                self.retries += 1
+                continue
+            self.frame = frame
+            return snap
+        return None
+
+    def _decode(self, buf, base, head):
+        _seq, level, level_count, lives, width, height, n_active, n_target, n_sel, focus = head
+        layers = []
+        for layer, n in enumerate((n_active, n_target)):
+            cols = {}
+            for name, (off, code, size) in _layer_offsets(base, layer, self.capacity).items():
+                cols[name] = array(code, bytes(buf[off:off + n * size]))
+            layers.append(cols)
+        sel_off = base + _SLOT_HEAD.size + 2 * _LAYER_BYTES * self.capacity
+        return {
+            "level": level, "level_count": level_count, "lives": lives, "width": width, "height": height,
+            "active": layers[0], "target": layers[1],
+            "selected": list(struct.unpack_from(f"<{n_sel}q", buf, sel_off)),
+            "focus": None if focus < 0 else focus,
+        }
+
+    def close(self):
+        self.shm.close()
+
+
+_GEOMETRY = ("cx", "cy", "size", "rotation", "sides")
+
+
+def _rows(cols, indices=None):
+    # id -> (cx, cy, size, rotation, sides); indices: csak ezek a sorok
+    ids = cols["ids"]
+    if indices is None:
+        indices = range(len(ids))
+    return {ids[i]: tuple(cols[name][i] for name in _GEOMETRY) for i in indices}
+
+
+class LPSpectatorScene:
+    # saját táblák és saját rajzoló; a pillanatképek közti különbség alapján csak a változott alakzatokhoz nyúl
+    def __init__(self, renderer):
+        from lp_shapes import LPShapeTable
+        self.renderer = renderer
+        self.active = LPShapeTable()
+        self.target = LPShapeTable()
+        self._prev = {"active": None, "target": None}
+        self._last_sel = None
+
+    def apply(self, snap) -> bool:
+        renderer = self.renderer
+        changed = self._sync("target", self.target, snap["target"], renderer.draw_ghost, "#3fb950")
+        changed |= self._sync("active", self.active, snap["active"], renderer.draw_shape, "#6cb6ff")
+        sel = (snap["selected"], snap["focus"])
+        if changed or sel != self._last_sel:
+            self._last_sel = sel
+            shown = [sid for sid in snap["selected"] if sid in self.active]
+            if not shown and snap["focus"] is not None and snap["focus"] in self.active:
+                shown = [snap["focus"]]
+            renderer.draw_selection([self.active[sid] for sid in shown])
+            return True
+        return False
+
+    def _changed_rows(self, prev, cols):
+        # azonos sorrendű táblánál a változott sorok vektorosan (NumPy) keresendők, nem alakzatonként
+        import numpy as np
+        mask = np.zeros(len(cols["ids"]), dtype=bool)
+        for name in _GEOMETRY:
+            mask |= np.frombuffer(cols[name], dtype=cols[name].typecode) != \
+                np.frombuffer(prev[name], dtype=prev[name].typecode)
+        return np.flatnonzero(mask).tolist()
+
+    def _sync(self, layer, table, cols, draw, color):
+        prev = self._prev[layer]
+        self._prev[layer] = cols
+        if prev is not None and prev["ids"] == cols["ids"]:
+            if all(prev[name] == cols[name] for name in _GEOMETRY):
+                return False
+            rows = _rows(cols, self._changed_rows(prev, cols))
+        else:
+            # szintváltás, illesztés (törlés) vagy az első kép: teljes összevetés
+            rows = _rows(cols)
+            for sid in [sid for sid in table.ids if sid not in rows]:
+                self.renderer.remove_shape(table[sid])
+                table.remove(sid)
+        self._apply_rows(table, rows, draw, color)
+        return True
+
+    def _apply_rows(self, table, rows, draw, color):
+        from lp_shapes import LPShape
+        renderer = self.renderer
+        for sid in sorted(rows):
+            cx, cy, size, rotation, sides = rows[sid]
+            if sid not in table:
+                table.add(LPShape(cx=cx, cy=cy, size=size, rotation=rotation, sides=sides, color=color), sid)
+                draw(table[sid])
+                continue
+            sh = table[sid]
+            if (sh.cx, sh.cy, sh.size, sh.rotation, sh.sides) != (cx, cy, size, rotation, sides):
+                sh.cx, sh.cy, sh.size, sh.rotation, sh.sides = cx, cy, size, rotation, sides
+                renderer.update_shape(sh)
+
+
+class LPSpectatorApp:
+    # külön folyamat saját Tk ablakkal; a teljes világot az ablakhoz igazítja
+    def __init__(self, root, reader: LPSpectatorReader, poll_ms: int = LP_SPEC_PUBLISH_MS):
+        import tkinter as tk
+        from lp_render import LPViewport, LPViewportRenderer
+        self.root = root
+        self.reader = reader
+        self.poll_ms = poll_ms
+        root.title("LP Shape Evolution – néző")
+        self.canvas = tk.Canvas(root, bg="#0f1115", highlightthickness=0, width=960, height=540)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.view = LPViewport(1600, 900, 960, 540, min_zoom=0.01)
+        self.renderer = LPViewportRenderer(self.canvas, self.view)
+        self.scene = LPSpectatorScene(self.renderer)
+        self._world = None
+        self.canvas.bind("<Configure>", lambda e: self._fit())
+        root.protocol("WM_DELETE_WINDOW", self.close)
+        self._job = root.after(poll_ms, self._poll)
+
+    def _fit(self):
+        self.view.resize(self.canvas.winfo_width(), self.canvas.winfo_height())
+        self.view.fit()
+        self.renderer.refresh()
+
+    def _poll(self):
+        self._job = None
+        snap = self.reader.read()
+        if snap is not None:
+            if (snap["width"], snap["height"]) != self._world:
+                self._world = snap["width"], snap["height"]
+                self.view.world_w, self.view.world_h = self._world
+                self.renderer.draw_background(snap["width"], snap["height"])
+                self._fit()
+            self.scene.apply(snap)
+            self.renderer.draw_hud(snap["level"] - 1, snap["level_count"])
+            self.root.title(f"LP Shape Evolution – néző • {snap['level']}. szint • " + "❤" * snap["lives"])
+        elif not self.reader.running:
+            self.root.title("LP Shape Evolution – néző (a játék véget ért)")
+            return
+        self._job = self.root.after(self.poll_ms, self._poll)
+
+    def close(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+        self.reader.close()
+        self.root.destroy()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LP Shape Evolution – élő nézői ablak")
+    ap.add_argument("name", help="a játék osztott memória szegmensének neve")
+    ap.add_argument("--poll-ms", type=int, default=LP_SPEC_PUBLISH_MS)
+    args = ap.parse_args(argv)
+    try:
+        reader = LPSpectatorReader(args.name)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"nem található futó játék: {args.name} ({e})", file=sys.stderr)
+        return 1
+    import tkinter as tk
+    root = tk.Tk()
+    LPSpectatorApp(root, reader, args.poll_ms)
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,9 @@ import time
 from dataclasses import dataclass, field
 from typing import List
 
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+# a matplotlib csak a statisztika ablak első megnyitásakor töltődik be (lásd lp_show_stats_window)
+LP_STATS_HEAVY_MODULES = ("matplotlib.figure", "matplotlib.backends.backend_tkagg")
+
 
 @dataclass
 class LPStats:
@@ -13,53 +14,159 @@ class LPStats:
     start_times: List[float] = field(default_factory=list)
     elapsed: List[float] = field(default_factory=list)
     attempts: List[int] = field(default_factory=list)
+    lives_lost: List[int] = field(default_factory=list)
+    listeners: list = field(default_factory=list, repr=False, compare=False)
 
     def __post_init__(self):
         self.start_times = [0.0] * (self.total_levels + 1)
         self.elapsed = [0.0] * (self.total_levels + 1)
         self.attempts = [0] * (self.total_levels + 1)
+        self.lives_lost = [0] * (self.total_levels + 1)
 
     def start_level(self, level: int):
         self.start_times[level] = time.perf_counter()
         self.attempts[level] += 1
 
+    def lose_life(self, level: int):
+        self.lives_lost[level] += 1
+
     def finish_level(self, level: int) -> float:
         dt = time.perf_counter() - self.start_times[level]
         self.elapsed[level] = dt
+        self._notify("finish", level)
         return dt
 
+    def _notify(self, event: str, level: int | None = None):
+        # figyelők: cb(stats, esemény, szint); esemény: "finish" (szint kész) vagy "load" (betöltés)
+        for cb in list(self.listeners):
+            cb(self, event, level)
+
     def as_dict(self):
-        return {"elapsed": self.elapsed, "attempts": self.attempts, "total": self.total_levels}
+        # másolatok: a pillanatkép a háttérszálon is biztonságosan kódolható
+        return {"elapsed": list(self.elapsed), "attempts": list(self.attempts), "lives_lost": list(self.lives_lost),
+                "total": self.total_levels}
 
     def from_dict(self, d: dict):
         self.total_levels = int(d.get("total", self.total_levels))
         self.elapsed = d.get("elapsed", self.elapsed)
         self.attempts = d.get("attempts", self.attempts)
+        self.lives_lost = d.get("lives_lost", [0] * (self.total_levels + 1))
+        self._notify("load")
+
+
+class LPStatsView:
+    # egyetlen, újrahasznált statisztika ablak; az oszlopokat helyben frissíti
+    # history: LPHistoryStore, who: () -> (játékos, nehézség) a korábbi legjobb idők vonalához
+    def __init__(self, parent, stats: LPStats, history=None, who=None):
+        self.parent = parent
+        self.stats = stats
+        self.history = history
+        self.who = who
+        self.win = None
+        self.fig = None
+        self.ax = None
+        self.bars = []
+        self.best_line = None
+        self.figure_canvas = None
+        self.attempts_var = None
+        self._dirty = True
+        stats.listeners.append(self._on_stats)
+
+    def _alive(self) -> bool:
+        return self.win is not None and bool(self.win.winfo_exists())
+
+    def _build(self):
+        import tkinter as tk
+        from tkinter import ttk
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.win = tk.Toplevel(self.parent)
+        self.win.title("Statisztika")
+        self.win.geometry("640x420")
+        # bezáráskor csak elrejtjük, így a következő megnyitás nem épít újra mindent
+        self.win.protocol("WM_DELETE_WINDOW", self.win.withdraw)
+
+        self.fig = Figure(figsize=(6.0, 3.2), dpi=100)
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_title("Szintidők (s)")
+        self.ax.set_xlabel("Szint")
+        self.ax.set_ylabel("Idő [s]")
+        self._build_bars()
+        if self.history is not None:
+            (self.best_line,) = self.ax.plot([], [], "o--", color="#ffb000", label="Korábbi legjobb")
+            self.ax.legend(loc="upper left")
+        self.fig.tight_layout()
+
+        self.figure_canvas = FigureCanvasTkAgg(self.fig, master=self.win)
+        self.figure_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        frm = ttk.Frame(self.win)
+        frm.pack(fill=tk.X)
+        self.attempts_var = tk.StringVar(value="")
+        ttk.Label(frm, textvariable=self.attempts_var).pack(padx=8, pady=8, anchor="w")
+
+    def _build_bars(self):
+        for bar in self.bars:
+            bar.remove()
+        levels = list(range(1, self.stats.total_levels + 1))
+        self.bars = list(self.ax.bar(levels, [0.0] * len(levels)))
 
-def lp_show_stats_window(parent, stats: LPStats):
-    import tkinter as tk
-    from tkinter import ttk
+    def show(self):
+        if not self._alive():
+            self._build()
+            self._dirty = True
+        self.win.deiconify()
+        self.win.lift()
+        self.refresh()
 
-    win = tk.Toplevel(parent)
-    win.title("Statisztika")
-    win.geometry("640x420")
+    def _on_stats(self, _stats, _event=None, _level=None):
+        self._dirty = True
+        # rejtett ablakot nem rajzolunk, a következő megjelenítéskor frissül
+        if self._alive() and self.win.winfo_viewable():
+            self.refresh()
 
-    fig = Figure(figsize=(6.0, 3.2), dpi=100)
-    ax = fig.add_subplot(111)
+    def refresh(self):
+        if not self._alive() or not self._dirty:
+            return
+        stats = self.stats
+        levels = list(range(1, stats.total_levels + 1))
+        if len(self.bars) != len(levels):
+            self._build_bars()
+        top = 0.0
+        for bar, i in zip(self.bars, levels):
+            h = max(0.0, float(stats.elapsed[i]))
+            bar.set_height(h)
+            top = max(top, h)
+        text = f"Kísérletek: {[stats.attempts[i] for i in levels]}"
+        if self.best_line is not None and self.who is not None:
+            player, difficulty = self.who()
+            best = self.history.player_best_times(player, difficulty, levels)
+            pts = [(lv, t) for lv, t in zip(levels, best) if t is not None]
+            self.best_line.set_data([p[0] for p in pts], [p[1] for p in pts])
+            top = max([top] + [p[1] for p in pts])
+            ranks = []
+            for lv, _t in pts:
+                pct = self.history.player_percentile(player, difficulty, lv)
+                ranks.append(f"{lv}: {pct:.0f}%")
+            if ranks:
+                text += "\nPercentilis (legjobb idő): " + ", ".join(ranks)
+        self.ax.set_ylim(0, top * 1.1 if top > 0 else 1.0)
+        self.attempts_var.set(text)
+        self.figure_canvas.draw_idle()
+        self._dirty = False
 
-    levels = list(range(1, stats.total_levels + 1))
-    times = [max(0.0, float(stats.elapsed[i])) for i in levels]
 
-    ax.bar(levels, times)
-    ax.set_title("Szintidők (s)")
-    ax.set_xlabel("Szint")
-    ax.set_ylabel("Idő [s]")
-    fig.tight_layout()
+_LP_STATS_VIEWS = {}
 
-    canvas = FigureCanvasTkAgg(fig, master=win)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-    frm = ttk.Frame(win)
-    frm.pack(fill=tk.X)
-    ttk.Label(frm, text=f"Kísérletek: {[stats.attempts[i] for i in levels]}").pack(padx=8, pady=8, anchor="w")
+def lp_show_stats_window(parent, stats: LPStats, history=None, who=None) -> LPStatsView:
+    view = _LP_STATS_VIEWS.get(id(stats))
+    if view is None or view.stats is not stats or view.parent is not parent or view.history is not history:
+        if view is not None and view._on_stats in view.stats.listeners:
+            view.stats.listeners.remove(view._on_stats)
+        view = LPStatsView(parent, stats, history, who)
+        _LP_STATS_VIEWS[id(stats)] = view
+    view.who = who
+    view.show()
+    return view
@@ -0,0 +1,97 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+from collections import deque
+
+from lp_shapes import LPShape
+
+LP_UNDO_CAP = 200  # ennyi lépés vonható vissza; a legrégebbi lépés kiesik
+
+# a lépések csak a ténylegesen megváltozott alakzatok megváltoztathatatlan állapotát (tuple) tárolják,
+# a tábla többi sorát nem másolják: egy lépés költsége O(módosult alakzatok)
+
+
+def lp_shape_state(sh):
+    # szerkeszthető geometria: mozgatás, forgatás, méretezés
+    return (sh.cx, sh.cy, sh.size, sh.rotation)
+
+
+def lp_set_shape_state(sh, state):
+    sh.cx, sh.cy, sh.size, sh.rotation = state
+
+
+def lp_shape_record(sh):
+    # a teljes sor, hogy egy illesztés visszavonásakor az alakzat ugyanazzal az azonosítóval visszakerüljön
+    return (sh.cx, sh.cy, sh.size, sh.rotation, sh.sides, sh.color)
+
+
+def lp_record_shape(rec) -> LPShape:
+    cx, cy, size, rotation, sides, color = rec
+    return LPShape(cx=cx, cy=cy, size=size, rotation=rotation, sides=sides, color=color)
+
+
+class LPUndoHistory:
+    # lépések: ("move", {id: (előtte, utána)}) vagy ("match", [(aktív id, cél id, aktív sor, cél sor)])
+    def __init__(self, cap: int = LP_UNDO_CAP):
+        self.cap = cap
+        self.undo_steps = deque(maxlen=cap)
+        self.redo_steps = []
+        # nyitott lépés (húzás közben): id -> az első érintés előtti állapot
+        self._open = {}
+
+    def __len__(self):
+        return len(self.undo_steps)
+
+    @property
+    def can_undo(self):
+        return bool(self.undo_steps or self._open)
+
+    @property
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self._open = {}
+
+    def touch(self, sid, state):
+        # a módosítás előtt hívandó; egy lépésen belül csak az első állapot számít
+        if sid not in self._open:
+            self._open[sid] = state
+
+    def commit(self, table):
+        # lezárja a nyitott lépést; a változatlanul maradt (vagy közben törölt) alakzatok kimaradnak
+        if not self._open:
+            return False
+        moves = {}
+        for sid, before in self._open.items():
+            if sid in table:
+                after = lp_shape_state(table[sid])
+                if after != before:
+                    moves[sid] = (before, after)
+        self._open = {}
+        if not moves:
+            return False
+        self._push(("move", moves))
+        return True
+
+    def push_match(self, matches):
+        self._push(("match", matches))
+
+    def _push(self, step):
+        self.undo_steps.append(step)
+        self.redo_steps.clear()
+
+    def pop_undo(self):
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        self.redo_steps.append(step)
+        return step
+
+    def pop_redo(self):
+        if not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        return step
@@ -3,6 +3,15 @@
 import json
 import math
 
+from lp_savefile import lp_atomic_write, lp_decode_save, lp_is_binary_save
+
+# (pozíció [px], forgatás [fok], méretarány) tűréshatárok nehézségenként
+LP_THRESHOLDS = {
+    "easy": (120.0, 45.0, 0.50),
+    "normal": (70.0, 28.0, 0.35),
+    "hard": (40.0, 18.0, 0.22),
+}
+
 
 def lp_deg_norm(deg: float) -> float:
     deg = deg % 360.0
@@ -16,14 +25,27 @@ def lp_distance(p1, p2) -> float:
     return math.hypot(x1 - x2, y1 - y2)
 
 
+def lp_pair_errors(a, t):
+    # egy pár hibái NumPy nélkül, ugyanúgy, mint az lp_scoring.lp_score_pairs: (távolság, forgatás, méretarány)
+    d = math.hypot(a.cx - t.cx, a.cy - t.cy)
+    if d < 1.0:
+        d = 0.0
+    rot = (a.rotation - t.rotation) % 360.0
+    rot = min(rot, 360.0 - rot)
+    return d, rot, abs(a.size - t.size) / t.size
+
+
 def lp_save_json(path: str, data: dict):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    lp_atomic_write(path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
 
 
 def lp_load_json(path: str) -> dict | None:
+    # JSON és bináris (.lpsave) mentést is elfogad
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            raw = f.read()
+        if lp_is_binary_save(raw):
+            return lp_decode_save(raw)
+        return json.loads(raw.decode("utf-8"))
     except Exception:
         return None
@@ -5,7 +5,11 @@
 2025.09.21
 """
 
+import time
+
+LP_T0 = time.perf_counter()
+
 from lp_app import run_app
 
 if __name__ == "__main__":
-    run_app()
+    run_app(LP_T0)
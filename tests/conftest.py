@@ -0,0 +1,33 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import os
+import sys
+
+import pytest
+
+# a modulok a projekt gyökerében vannak (nincs csomag)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lp_game import LPGame  # noqa: E402
+from lp_stats import LPStats  # noqa: E402
+
+
+def lp_new_game(seed: int = 7, level: int = 3) -> LPGame:
+    game = LPGame(width=1600, height=900, level_count=5, stats=LPStats(total_levels=5), seed=seed)
+    game.level = level
+    game.new_level()
+    return game
+
+
+def lp_align(game, ids):
+    # a megadott aktív alakzatokat pontosan a céljukra teszi, és kijelöli őket
+    for sid in ids:
+        sh, t = game.active_shapes[sid], game.target_shapes[sid]
+        sh.cx, sh.cy, sh.size, sh.rotation = t.cx, t.cy, t.size, t.rotation
+    game._rebuild_index()
+    game.selected_ids = set(ids)
+
+
+@pytest.fixture
+def game():
+    return lp_new_game()
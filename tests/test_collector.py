@@ -0,0 +1,56 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import asyncio
+import sqlite3
+
+from lp_collector import LPCollector
+from lp_history import LPHistoryStore
+
+
+def _record(uid, **kw):
+    rec = {"player": "a", "difficulty": "normal", "level": 1, "seconds": 2.0, "uid": uid}
+    rec.update(kw)
+    return rec
+
+
+def _run(coro_fn):
+    async def main():
+        store = LPHistoryStore(":memory:")
+        collector = LPCollector(store, flush_ms=0.5)
+        await collector.start("127.0.0.1", 0)
+        try:
+            return await coro_fn(collector, store)
+        finally:
+            await collector.close()
+    return asyncio.run(main())
+
+
+def test_bad_record_rejects_whole_batch():
+    async def body(collector, store):
+        bad = _record("u2")
+        del bad["level"]
+        try:
+            await collector._submit([_record("u1"), bad])
+        except KeyError:
+            pass
+        assert store.pending == []
+        assert (await collector._submit([_record("u3", seconds=1.5)]))["stored"] == 1
+        return store.leaderboard("normal", 1)
+    assert _run(body) == [("a", 1.5)]
+
+
+def test_database_error_keeps_flush_loop_alive():
+    async def body(collector, store):
+        flush = store.flush
+
+        def locked():
+            raise sqlite3.OperationalError("database is locked")
+
+        store.flush = locked
+        reply = await collector._submit([_record("u1")])
+        assert reply["ok"] is False and reply["retry"] is True
+        store.flush = flush
+        # az újraküldés (ugyanazzal az uid-dal) már bekerül
+        assert (await collector._submit([_record("u1")]))["ok"]
+        return store.leaderboard("normal", 1)
+    assert _run(body) == [("a", 2.0)]
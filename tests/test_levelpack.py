@@ -0,0 +1,48 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import pytest
+
+from lp_levelpack import LPLevelPack, LPLevelPackWriter, lp_build_pack, lp_load_pack, lp_save_pack
+from lp_shapes import LPShape
+
+
+def _dump(pack, levels):
+    return {level: [[[s.as_dict() for s in part] for part in pack.board(level, k)]
+                    for k in range(pack.count(level))] for level in levels}
+
+
+def test_binary_matches_json(tmp_path):
+    pack = lp_build_pack(levels=3, candidates=30, per_level=4, workers=1, base_seed=1)
+    lp_save_pack(str(tmp_path / "p.lppack"), pack)
+    lp_save_pack(str(tmp_path / "p.json"), pack)
+    binary = lp_load_pack(str(tmp_path / "p.lppack"))
+    try:
+        text = lp_load_pack(str(tmp_path / "p.json"))
+        assert isinstance(text, LPLevelPack)
+        assert len(binary) == len(text) == 12
+        assert (binary.width, binary.height) == (text.width, text.height)
+        assert _dump(binary, (1, 2, 3)) == _dump(text, (1, 2, 3))
+    finally:
+        binary.close()
+
+
+def test_colour_limit_leaves_writer_usable(tmp_path):
+    path = tmp_path / "c.lppack"
+    writer = LPLevelPackWriter(str(path), 1600, 900)
+
+    def shape(color):
+        return LPShape(cx=100, cy=100, size=40, rotation=0.0, sides=3, color=color)
+
+    for i in range(255):
+        writer.add(1, [shape(f"#{i:06x}")], [shape("#000000")])
+    with pytest.raises(ValueError):
+        writer.add(1, [shape("#ffffff")], [shape("#000000")])
+    assert len(writer.colors) == 255
+    writer.close()
+    pack = lp_load_pack(str(path))
+    try:
+        assert pack.count(1) == 255
+        targets, _actives = pack.board(1, 254)
+        assert targets[0].color == "#0000fe"
+    finally:
+        pack.close()
@@ -0,0 +1,51 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import random
+
+from conftest import lp_new_game
+from lp_bots import LPBot
+from lp_levelpack import lp_build_pack
+from lp_replay import LPRecorder, lp_replay
+
+
+def _play(game):
+    # csak nyilvános, rögzített műveletek: a pontos illesztést is a "perfect" bot végzi
+    bot = LPBot("perfect", random.Random(1))
+    game.reset()
+    for _level in range(2):
+        sid = sorted(game.active_shapes.ids)[0]
+        sh = game.active_shapes[sid]
+        game.pointer_down(sh.cx, sh.cy)
+        game.drag_to(sh.cx + 12, sh.cy - 7)
+        game.pointer_up(sh.cx, sh.cy)
+        game.rotate_active(10)
+        game.scale_active(1.05)
+        game.check_alignment_batch()
+        game.undo()
+        game.redo()
+        assert bot.play_level(game)["cleared"]
+        game.next_level()
+
+
+def test_record_replay_verifies():
+    game = lp_new_game(seed=11, level=1)
+    recorder = LPRecorder()
+    recorder.start(game)
+    _play(game)
+    result = lp_replay(recorder.finish())
+    assert result["ok"], result["mismatch"]
+    replayed = result["game"]
+    assert replayed.stats.lives_lost == game.stats.lives_lost
+    assert replayed.stats.elapsed[1] > 0.0
+
+
+def test_record_replay_with_pack():
+    pack = lp_build_pack(levels=3, candidates=30, per_level=4, workers=1, base_seed=3)
+    game = lp_new_game(seed=5, level=1)
+    game.load_pack(pack)
+    recorder = LPRecorder()
+    recorder.start(game)
+    _play(game)
+    # a visszajátszás csomag nélkül fut: a pályák a felvételből jönnek
+    result = lp_replay(recorder.finish())
+    assert result["ok"], result["mismatch"]
@@ -0,0 +1,87 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+from conftest import lp_new_game
+from lp_savefile import LPJournal, lp_decode_save, lp_encode_save, lp_save_binary
+from lp_utils import lp_load_json, lp_save_json
+
+
+def _state(game):
+    # a statisztika külön objektum (LPStats), a játékállapot from_dict-je nem tölti vissza
+    state = game.to_dict()
+    state.pop("stats")
+    return state
+
+
+def _assign_match(game):
+    # "assign" illesztés keresztbe: az aktív és cél azonosítók ezután eltérnek
+    a, b = sorted(game.active_shapes.ids)[:2]
+    game.set_match_mode("assign")
+    sa, sb = game.active_shapes[a], game.active_shapes[b]
+    ta = game.target_shapes[b]
+    sa.cx, sa.cy, sa.size, sa.rotation = ta.cx, ta.cy, ta.size, ta.rotation
+    sa.sides = ta.sides
+    game._rebuild_index()
+    game.level = 1
+    game.selected_ids = {a}
+    ok, _msg = game.check_alignment_batch()
+    assert ok
+    return sb
+
+
+def test_binary_roundtrip(tmp_path, game):
+    _assign_match(game)
+    state = _state(game)
+    path = tmp_path / "a.lpsave"
+    lp_save_binary(str(path), state)
+    loaded = lp_new_game(seed=99, level=1)
+    loaded.from_dict(lp_load_json(str(path)))
+    assert _state(loaded) == state
+
+
+def test_json_roundtrip(tmp_path, game):
+    _assign_match(game)
+    state = _state(game)
+    path = tmp_path / "a.json"
+    lp_save_json(str(path), state)
+    loaded = lp_new_game(seed=99, level=1)
+    loaded.from_dict(lp_load_json(str(path)))
+    assert _state(loaded) == state
+
+
+def test_encode_decode_keeps_ids(game):
+    state = game.to_dict()
+    decoded = lp_decode_save(lp_encode_save(state, generation=5))
+    assert decoded["generation"] == 5
+    assert decoded["active_ids"] == state["active_ids"]
+    assert decoded["target"] == state["target"]
+
+
+def test_journal_recover(tmp_path, game):
+    journal = LPJournal(str(tmp_path / "auto.lpsave"))
+    journal.record(game.to_dict())
+    sid = sorted(game.active_shapes.ids)[0]
+    game.active_shapes[sid].cx += 17
+    assert journal.record(game.to_dict()) == 1
+    game.active_shapes.remove(sid)
+    game.lives = 1
+    assert journal.record(game.to_dict()) == 2
+    restored = lp_new_game(seed=99, level=1)
+    restored.from_dict(journal.recover())
+    assert _state(restored) == _state(game)
+
+
+def test_journal_ignores_torn_tail(tmp_path, game):
+    journal = LPJournal(str(tmp_path / "auto.lpsave"))
+    journal.record(game.to_dict())
+    sid = sorted(game.active_shapes.ids)[0]
+    game.active_shapes[sid].cx += 5
+    journal.record(game.to_dict())
+    committed = _state(game)
+    game.active_shapes[sid].cx += 5
+    journal.record(game.to_dict())
+    # félbeszakadt utolsó blokk: a COMMIT rekord vége hiányzik
+    with open(journal.journal_path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 3)
+    restored = lp_new_game(seed=99, level=1)
+    restored.from_dict(journal.recover())
+    assert _state(restored) == committed
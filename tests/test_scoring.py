@@ -0,0 +1,56 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from conftest import lp_new_game
+from lp_scoring import lp_linear_assignment
+
+
+def _brute_force(cost):
+    n, m = cost.shape
+    best = np.inf
+    if n <= m:
+        for cols in itertools.permutations(range(m), n):
+            best = min(best, sum(cost[r, c] for r, c in enumerate(cols)))
+    else:
+        for rows in itertools.permutations(range(n), m):
+            best = min(best, sum(cost[r, c] for c, r in enumerate(rows)))
+    return best
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (3, 3), (4, 4), (5, 5), (2, 5), (5, 3), (6, 6)])
+def test_linear_assignment_matches_brute_force(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(20):
+        cost = rng.integers(0, 20, size=shape).astype(float)
+        rows, cols = lp_linear_assignment(cost)
+        assert len(rows) == min(shape)
+        assert len(set(rows)) == len(rows) and len(set(cols)) == len(cols)
+        assert cost[rows, cols].sum() == pytest.approx(_brute_force(cost))
+
+
+def test_linear_assignment_avoids_forbidden_pairs():
+    cost = np.array([[1.0, np.inf, 5.0], [np.inf, 2.0, np.inf], [3.0, np.inf, np.inf]])
+    rows, cols = lp_linear_assignment(cost)
+    assert np.isfinite(cost[rows, cols]).all()
+    assert cost[rows, cols].sum() == 10.0
+
+
+def test_scalar_and_vector_scoring_agree():
+    rng = random.Random(4)
+    for difficulty in ("easy", "normal", "hard"):
+        game = lp_new_game(seed=rng.getrandbits(32), level=5)
+        game.set_difficulty(difficulty)
+        ids = sorted(game.active_shapes.ids)
+        for _ in range(300):
+            for sid in ids:
+                a, t = game.active_shapes[sid], game.target_shapes[sid]
+                a.cx = t.cx + rng.randint(-130, 130)
+                a.cy = t.cy + rng.randint(-60, 60)
+                a.rotation = t.rotation + rng.uniform(-400, 400)
+                a.size = max(1, int(t.size * rng.uniform(0.4, 1.6)))
+            assert game._pairs_ok(ids) == bool(game.score_pairs(ids)[1].all())
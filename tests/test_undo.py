@@ -0,0 +1,42 @@
+# CREATED BY Laczi Péter - R9SAAO
+
+from conftest import lp_align
+
+
+def test_undo_redo_after_match(game):
+    # több pár, mint egy köteg: az illesztés után a szint nem zárul le, így visszavonható
+    game.set_board(1600, 900, 8)
+    game.new_level()
+    ids = sorted(game.active_shapes.ids)[:game.required_batch()]
+    lp_align(game, ids)
+    aligned = game.to_dict()
+    ok, _msg = game.check_alignment_batch()
+    assert ok
+    assert not any(sid in game.active_shapes for sid in ids)
+    matched = game.to_dict()
+
+    assert game.undo()
+    # az illesztés visszavonása ugyanazokkal az azonosítókkal hozza vissza a párokat
+    assert game.to_dict() == aligned
+    assert game.redo()
+    assert game.to_dict() == matched
+    assert game.undo()
+    assert game.to_dict() == aligned
+    # az lp_align közvetlenül írt, ezért előtte nincs több lépés
+    assert not game.undo()
+
+
+def test_drag_is_one_step(game):
+    sid = sorted(game.active_shapes.ids)[-1]
+    sh = game.active_shapes[sid]
+    x, y = sh.cx, sh.cy
+    game.snap_radius = -1.0
+    game.pointer_down(x, y)
+    assert game._drag_id == sid
+    for k in range(1, 6):
+        game.drag_to(x + 10 * k, y)
+    game.pointer_up(x + 50, y)
+    assert game.active_shapes[sid].cx == x + 50
+    assert game.undo()
+    assert game.active_shapes[sid].cx == x
+    assert not game.undo()